@@ -1,25 +1,36 @@
 from tuleap_wrapper.Fields import *
 from tuleap_wrapper import tracker_struct_manager as tsm
 from tuleap_wrapper import tuleap_endpoint as tue
-from typing import Self
+from tuleap_wrapper.metrics import OperationEvent
+from typing import Self, TYPE_CHECKING
 import copy
+import asyncio
+import heapq
+import time
+
+if TYPE_CHECKING:
+    # Imported by the async methods only, synchronous users do not pay for it
+    from tuleap_wrapper import async_endpoint as aue
 
 class Artifact:
     __tracker_struct_manager = tsm.Tracker_struct_manager()
-    __tuleap_endpoint = tue.TuleapEndpoint()
+    __tuleap_endpoint = tue.LazyEndpoint()
 
-    def __init__(self, id=None, id_tracker=None, tracker_struct=None, raw_fields=None):
+    __slots__ = ("__id", "__id_tracker", "__tracker_struct", "__raw_fields", "__raw_values")
+    def __init__(self, id=None, id_tracker=None, tracker_struct=None, raw_fields=None, raw_values=None):
         self.__id = id
         self.__id_tracker = id_tracker
         self.__tracker_struct: tsm.TrackerStruct = tracker_struct
         self.__raw_fields = raw_fields
+        # Values of the artifact JSON by field ID, not decoded yet (lazy mode)
+        self.__raw_values = raw_values or dict()
         # TODO: Require id_tracker in some way
 
         if not raw_fields:
             self.__raw_fields = dict()
 
-        if (id_tracker):
-            self.__tracker_struct = tsm.TrackerStruct(self.__tracker_struct_manager.get_ts(id_tracker))
+        if (id_tracker and not tracker_struct):
+            self.__tracker_struct = self.__tracker_struct_manager.get_compiled(id_tracker)
 
         if (self.__tracker_struct):
             dependent_fields = self.__tracker_struct.ruleSet.get_dependent_field_ids()
@@ -28,7 +39,12 @@ class Artifact:
                     field.dependent = True
 
     @classmethod
-    def from_json(cls, jsonData, currentORprevious=None, tracker_struct_json=None) -> Self:
+    def from_json(cls, jsonData, currentORprevious=None, tracker_struct_json=None, lazy=False) -> Self:
+        """
+            Builds the artifact from its JSON. With `lazy`, the values are kept as they are and a
+            field is decoded on its first get_field, for callers reading a few fields only.
+        """
+        start = time.perf_counter()
         if (currentORprevious):
             newJson = jsonData[currentORprevious]
             newJson["tracker"] = {}
@@ -42,84 +58,88 @@ class Artifact:
         else:
             newJson = jsonData
 
-        if not (tracker_struct_json):
-            tracker_struct_json = Artifact.__tracker_struct_manager.get_ts(newJson["tracker"]["id"])
-
-        curTrackerStruct = tsm.TrackerStruct(tracker_struct_json)
+        if (tracker_struct_json):
+            curTrackerStruct = tsm.TrackerStruct(tracker_struct_json)
+        else:
+            tracker_id = newJson["tracker"]["id"]
+            curTrackerStruct = Artifact.__tracker_struct_manager.get_compiled(tracker_id)
+            # A field unknown to the cached struct means the tracker was modified since it was fetched
+            if not all(curTrackerStruct.field_exists(value['field_id']) for value in newJson["values"]):
+                if Artifact.__tracker_struct_manager.refresh_on_unknown_field(tracker_id):
+                    curTrackerStruct = Artifact.__tracker_struct_manager.get_compiled(tracker_id)
+
+        if lazy:
+            # Decoded one by one by get_field, the unused ones are never decoded
+            raw_values = {value['field_id']: value for value in newJson["values"] if curTrackerStruct.field_exists(value['field_id'])}
+            tue.TuleapEndpoint.record_operation(OperationEvent("parse_artifact", time.perf_counter() - start))
+            return cls(id=newJson["id"],
+                       id_tracker=newJson["tracker"]["id"],
+                       tracker_struct=curTrackerStruct,
+                       raw_values=raw_values)
 
         fieldsDict = {}
         importedCounter = 0
+        decoder_plan = curTrackerStruct.get_decoder_plan()
         for value in newJson["values"]:
-            field_id = value['field_id']
-            if curTrackerStruct.field_exists(field_id):
+            decoded = decoder_plan.decode(value)
+            if decoded is not None:
                 importedCounter = importedCounter + 1
-                name = curTrackerStruct.idToName(field_id)
-                fieldType = value['type']
-
-                if (fieldType == Field_type.STRING):
-                    fieldsDict[name] = Field_string(field_id, name,value['value'])
-
-                elif (fieldType == Field_type.TEXT):
-                    fieldsDict[name] = Field_text(field_id, name, value['value'], t_format=value['format'])
-
-                elif(fieldType == Field_type.ARTLINKS):
-                    myArtLinks_list=[]
-
-                    for ilinks in value['links']:
-                        myArtLinks_list.append(Field_artLinks.ArtLink(id_artifact=ilinks['id'],
-                                                                    id_tracker=ilinks['tracker']['id'],
-                                                                    direction = Field_artLinks.ArtLink.Direction.FORWARD,
-                                                                    relation=ilinks['type']))
-                    for ilinks in value['reverse_links']:
-                        myArtLinks_list.append(Field_artLinks.ArtLink(id_artifact=ilinks['id'],
-                                                                    id_tracker=ilinks['tracker']['id'],
-                                                                    direction = Field_artLinks.ArtLink.Direction.REVERSE,
-                                                                    relation=ilinks['type']))
-
-                    fieldsDict[name] = Field_artLinks(field_id,name,myArtLinks_list)
-
-                elif (fieldType in (Field_type.DATE, Field_type.SUBON, Field_type.LUD)):
-                    if value['value']:
-                        fieldsDict[name] = Field_date(field_id, name, value['value'])
-                    else:
-                        fieldsDict[name] = Field_date(field_id,name)
-
-                elif (fieldType in (Field_type.MSB, Field_type.CB)):
-                    isUserField = (not value["values"]==[]) and ("username" in value["values"][0])
-                    if (isUserField):
-                        fieldsDict[name] = Field_users(field_id, name, curTrackerStruct.get_field_info(field_id), value['values'])
-                    else:
-                        fieldsDict[name] = Field_msb(field_id, name, curTrackerStruct.get_field_info(field_id), value['values'], fieldType=fieldType)
-
-                elif (fieldType in (Field_type.SB, Field_type.RB)):
-                    isUserField = (not value["values"]==[]) and ("username" in value["values"][0])
-                    if (isUserField):
-                        fieldsDict[name] = Field_user(field_id, name, curTrackerStruct.get_field_info(field_id), value['values'])
-                    else:
-                        fieldsDict[name] = Field_sb(field_id, name, curTrackerStruct.get_field_info(field_id), value['values'], fieldType=fieldType)
-
-                elif (fieldType in (Field_type.SUBBY, Field_type.LUBY)):
-                    fieldsDict[name] = Field_user(field_id, name, curTrackerStruct.get_field_info(field_id), [value['value']], fieldType=fieldType)
-
-                elif (fieldType == Field_type.FILES):
-                    fieldsDict[name] = Field_files(field_id, name, value["file_descriptions"])
-
-                elif (fieldType == Field_type.FLOAT):
-                    fieldsDict[name] = Field_float(field_id, name, value["value"])
-                else:
-                    fieldsDict[name] = value
+                name, field = decoded
+                fieldsDict[name] = field
 
         print("ASARTIFACTS: Successfully imported " + str(importedCounter) + " fields into artifact " + str(newJson["id"]))
+        tue.TuleapEndpoint.record_operation(OperationEvent("parse_artifact", time.perf_counter() - start))
         return cls(id=newJson["id"],
                    id_tracker=newJson["tracker"]["id"],
                    tracker_struct=curTrackerStruct,
                    raw_fields=fieldsDict)
 
     @classmethod
-    def from_id(cls, id) -> Self:
+    def from_id(cls, id, lazy=False) -> Self:
         json_art = cls.__tuleap_endpoint.get_artifact_by_id(id)
+        return cls.from_json(json_art, lazy=lazy)
+
+    @classmethod
+    def from_ids(cls, ids, lazy=False) -> dict[int, Self]:
+        """Fetches many artifacts in a few bulk requests, returns them keyed by ID."""
+        json_arts = cls.__tuleap_endpoint.get_artifacts_by_ids(ids)
+        return {art_id: cls.from_json(json_art, lazy=lazy) for art_id, json_art in json_arts.items()}
+
+    @classmethod
+    def iter_artifacts(cls, tracker_id, query=None, page_size=tue.TuleapEndpoint.ARTIFACTS_QUERY_LIMIT_MAX, expert_query=None, lazy=False):
+        """Generator over all the tracker artifacts, one request per page and at most two pages held in memory."""
+        for page in cls.__tuleap_endpoint.iter_artifact_pages(tracker_id, page_size=page_size, query=query, expert_query=expert_query):
+            for json_art in page:
+                yield cls.from_json(json_art, lazy=lazy)
+
+    @classmethod
+    async def afrom_id(cls, id, endpoint:"aue.AsyncTuleapEndpoint"=None) -> Self:
+        if endpoint is None:
+            from tuleap_wrapper import async_endpoint as aue
+            async with aue.AsyncTuleapEndpoint() as endpoint:
+                return await cls.afrom_id(id, endpoint)
+
+        json_art = await endpoint.get_artifact_by_id(id)
+        await cls.__tracker_struct_manager.aget_ts(json_art["tracker"]["id"], endpoint)
         return cls.from_json(json_art)
 
+    @classmethod
+    async def afrom_ids(cls, ids, endpoint:"aue.AsyncTuleapEndpoint"=None, max_in_flight=None) -> list[Self]:
+        """
+            Fetches many artifacts concurrently, keeping at most `max_in_flight` requests running,
+            AsyncTuleapEndpoint.DEFAULT_MAX_IN_FLIGHT by default.
+            Artifacts are returned in the order of `ids`.
+        """
+        if endpoint is None:
+            from tuleap_wrapper import async_endpoint as aue
+            async with aue.AsyncTuleapEndpoint(max_in_flight=max_in_flight or aue.AsyncTuleapEndpoint.DEFAULT_MAX_IN_FLIGHT) as endpoint:
+                return await cls.afrom_ids(ids, endpoint)
+
+        json_arts = await endpoint.get_artifacts_by_id_list(ids)
+        await asyncio.gather(*[cls.__tracker_struct_manager.aget_ts(tracker_id, endpoint)
+                               for tracker_id in {json_art["tracker"]["id"] for json_art in json_arts}])
+        return [cls.from_json(json_art) for json_art in json_arts]
+
     @property
     def id(self):
         return self.__id
@@ -140,11 +160,13 @@ class Artifact:
 
     def add_field(self, field:Field):
         self.__raw_fields[field.slug] = field
+        self.__raw_values.pop(field.id, None)
 
     def convert_msb(self, other_msb:Field_msb):
         new_msb = Field_msb(self.tracker_struct.nameToId(other_msb.slug),
                             other_msb.slug,
-                            self.tracker_struct.get_field_info(other_msb.slug))
+                            self.tracker_struct.get_field_info(other_msb.slug),
+                            value_maps=self.tracker_struct.get_value_maps(other_msb.slug))
         new_msb.add_list(label_list=other_msb.labels())
 
         return new_msb
@@ -152,15 +174,15 @@ class Artifact:
     def convert_sb(self, other_sb:Field_sb):
         new_sb = Field_sb(self.tracker_struct.nameToId(other_sb.slug),
                           other_sb.slug,
-                          self.tracker_struct.get_field_info(other_sb.slug))
+                          self.tracker_struct.get_field_info(other_sb.slug),
+                          value_maps=self.tracker_struct.get_value_maps(other_sb.slug))
         new_sb.add_list(label_list=other_sb.labels())
 
         return new_sb
 
     def convert_links(self, other_artLinks:Field_artLinks):
         new_artLinks = Field_artLinks(id=self.tracker_struct.nameToId(other_artLinks.slug), slug=other_artLinks.slug)
-        for link in other_artLinks.artLinks:
-            new_artLinks.add_link(link)
+        new_artLinks.set_links(other_artLinks.artLinks)
 
         return new_artLinks
 
@@ -183,20 +205,44 @@ class Artifact:
     def get_field(self, fieldSlug, field_id=None) -> Field:
         if field_id:
             return self.get_field(self.tracker_struct.idToName(field_id))
-        if not fieldSlug in self.__raw_fields.keys():
+        if not fieldSlug in self.__raw_fields.keys() and not self.__decode_raw_value(fieldSlug):
             self.init_field(fieldSlug)
             print("Requested field " + fieldSlug + " not found, initiating")
 
         return self.__raw_fields[fieldSlug]
 
     def get_fields(self):
+        self.__decode_raw_values()
         return self.__raw_fields
 
     def get_avail_fields(self):
+        self.__decode_raw_values()
         return self.__raw_fields.keys()
 
     def is_field(self, fieldSlug) -> bool:
-        return fieldSlug in self.__raw_fields.keys()
+        if fieldSlug in self.__raw_fields.keys():
+            return True
+        return (bool(self.__raw_values) and self.__tracker_struct.field_exists(fieldSlug) and
+                self.__tracker_struct.nameToId(fieldSlug) in self.__raw_values)
+
+    def __decode_raw_value(self, fieldSlug) -> bool:
+        """Decodes the field from the JSON value kept in lazy mode, returns False if there is none."""
+        if not self.__raw_values or not self.__tracker_struct.field_exists(fieldSlug):
+            return False
+        value = self.__raw_values.pop(self.__tracker_struct.nameToId(fieldSlug), None)
+        if value is None:
+            return False
+
+        name, field = self.__tracker_struct.get_decoder_plan().decode(value)
+        if isinstance(field, Field) and field.id in self.__tracker_struct.ruleSet.get_dependent_field_ids():
+            field.dependent = True
+        self.__raw_fields[name] = field
+        return True
+
+    def __decode_raw_values(self, field_ids=None):
+        for field_id in list(self.__raw_values.keys() if field_ids is None else field_ids):
+            if field_id in self.__raw_values:
+                self.__decode_raw_value(self.__tracker_struct.idToName(field_id))
 
     def init_field(self, fieldSlug):
         if self.is_field(fieldSlug):
@@ -204,7 +250,9 @@ class Artifact:
         elif not self.__tracker_struct.field_exists(fieldSlug):
             raise ValueError("ARTIFACT: 'init_field' requested slug not in tracker struct - " + fieldSlug)
 
-        newField = get_empty_field(field_struct=self.__tracker_struct.get_field_info(fieldSlug))
+        field_struct = self.__tracker_struct.get_field_info(fieldSlug)
+        value_maps = self.__tracker_struct.get_value_maps(fieldSlug) if "values" in field_struct else None
+        newField = get_empty_field(field_struct=field_struct, value_maps=value_maps)
         self.add_field(newField)
 
     def check_dependencies(self):
@@ -275,18 +323,73 @@ class Artifact:
             return True
         return False
 
-    def autocomplete_fields(self):
-        max_iterations = 10
-        invalid_fields = self.check_dependencies()
-
-        count = 0
-        while (count < max_iterations and len(invalid_fields) > 0):
-            for field_id in invalid_fields:
-                self.autocomplete_field(self.get_field("", field_id=field_id))
+    def is_dependency_valid(self, tgt_fid):
+        """Checks the values of a target field against the rules of each of its source fields."""
+        rule_set = self.__tracker_struct.ruleSet
+        tgt_vids = self.get_field("", tgt_fid).bind_values()
+        for src_fid in rule_set.get_source_field_ids(tgt_fid):
+            src_vids = self.get_field("", src_fid).bind_values()
+            for tgt_vid in tgt_vids:
+                allowed_src_vids = rule_set.get_source_rules(tgt_fid, tgt_vid).get(src_fid)
+                if allowed_src_vids is not None and not any(vid in allowed_src_vids for vid in src_vids):
+                    return False
+            for src_vid in src_vids:
+                allowed_tgt_vids = rule_set.get_target_rules(src_fid, src_vid).get(tgt_fid)
+                if allowed_tgt_vids is not None and not any(vid in allowed_tgt_vids for vid in tgt_vids):
+                    return False
+        return True
+
+    def autocomplete_fields(self, prefer_not_empty=False, invalid_fields=None):
+        """
+            Autocompletes the invalid dependent fields and propagates the changes to the fields
+            depending on them, returns the IDs of the fields left invalid.
+
+            Only the targets of a field whose value changed are checked again, sources before
+            their targets, and a field is changed at most once: it always terminates, after work
+            proportional to the rules of the fields touched.
+        """
+        rule_set = self.__tracker_struct.ruleSet
+        ranks = rule_set.get_field_ranks()
+        if invalid_fields is None:
             invalid_fields = self.check_dependencies()
 
+        worklist = [(ranks.get(fid, 0), fid) for fid in set(invalid_fields)]
+        heapq.heapify(worklist)
+        queued = set(invalid_fields)
+        changed = set()
+        remaining = set()
+        while worklist:
+            _, fid = heapq.heappop(worklist)
+            queued.discard(fid)
+            if self.is_dependency_valid(fid):
+                remaining.discard(fid)
+                continue
+
+            tgt_field:Field_msb = self.get_field("", field_id=fid)
+            previous_vids = tgt_field.bind_values()
+            if (fid in changed or
+                not self.autocomplete_field(tgt_field, prefer_not_empty) or
+                tgt_field.bind_values() == previous_vids):
+                remaining.add(fid)
+                continue
+
+            changed.add(fid)
+            if not self.is_dependency_valid(fid):
+                remaining.add(fid)
+            else:
+                remaining.discard(fid)
+            for dependent_fid in rule_set.get_target_field_ids(fid):
+                if dependent_fid not in queued:
+                    queued.add(dependent_fid)
+                    heapq.heappush(worklist, (ranks.get(dependent_fid, 0), dependent_fid))
+
+        return list(remaining)
+
     def list_update(self, only_updated=False):
         updated_fields=[]
+        if not only_updated and self.__raw_values:
+            # Dependent fields are sent even when untouched
+            self.__decode_raw_values(self.__tracker_struct.ruleSet.get_dependent_field_ids())
 
         for slug, field in self.__raw_fields.items():
             if isinstance(field, Field):
@@ -300,12 +403,9 @@ class Artifact:
         # Check dependencies first:
         if dependency_check:
             invalid_fids = self.check_dependencies()
-            remaining_invalid_fids = copy.copy(invalid_fids)
             if invalid_fids:
                 print(f"ART {self.id}:  Invalid field dependencies found: {[self.tracker_struct.idToName(id) for id in invalid_fids]} ")
-                for fid in invalid_fids:
-                    if self.autocomplete_field(self.get_field("", field_id=fid)):
-                        remaining_invalid_fids.remove(fid)
+                remaining_invalid_fids = self.autocomplete_fields(invalid_fields=invalid_fids)
                 if remaining_invalid_fids:
                     print(f"ART {self.id}: Cannot push update, remaining invalid fields {[self.tracker_struct.idToName(id) for id in remaining_invalid_fids]}")
                     return False
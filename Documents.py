@@ -1,22 +1,64 @@
 import os
-import requests
+import httpx
 from urllib.parse import urljoin
-from tusclient import client
-from tusclient.uploader.uploader import Uploader
+from tuleap_wrapper import tuleap_endpoint as tue
 
 CHUNK_SIZE = 2621440
+TUS_VERSION = "1.0.0"
+# PATCH responses in a row that did not move the upload forward before giving up
+MAX_UPLOAD_RETRIES = 3
+
+class UploadError(Exception):
+    """An upload request failed, or the server did not follow the TUS protocol or stopped accepting the file."""
 
 class DocumentInterface:
     __server_base_url = None
     __server_auth_token = None
 
-    def __init__(self, base_url:str, auth_token:str):
+    def __init__(self, base_url:str, auth_token:str, session:httpx.Client=None):
+        """
+            Initialize a new instance of the class.
+
+            Parameters:
+            base_url (str): Tuleap server URL.
+            auth_token (str): Access key sent with every request.
+            session (httpx.Client): Connection pool to send the requests with. Default is the pool
+                                    shared with TuleapEndpoint, looked up on each request so that a new
+                                    `configure` is followed, or a dedicated one while it is not configured.
+        """
         self.__server_base_url = base_url
         self.__server_auth_token = auth_token
         self.__req_headers = {
             "Content-Type": "application/json",
             "X-Auth-AccessKey": self.__server_auth_token
         }
+        self.__explicit_session = session
+        self.__fallback_session = None
+
+    def __session(self) -> httpx.Client:
+        if self.__explicit_session is not None:
+            return self.__explicit_session
+        shared = tue.TuleapEndpoint.session
+        if shared is not None and not shared.is_closed:
+            return shared
+        if self.__fallback_session is None or self.__fallback_session.is_closed:
+            endpoint = tue.TuleapEndpoint
+            self.__fallback_session = httpx.Client(verify=endpoint._ssl_verification(),
+                                                   timeout=httpx.Timeout(endpoint.timeout, connect=endpoint.connect_timeout))
+        return self.__fallback_session
+
+    def __post_json(self, req_url, req_payload, context):
+        try:
+            resp = self.__session().post(req_url, json=req_payload, headers=self.__req_headers)
+        except httpx.HTTPError as e:
+            raise UploadError(f"{context} failed: {e}") from e
+        self.__raise_for_status(resp, context)
+        return resp.json()
+
+    @staticmethod
+    def __raise_for_status(resp, context):
+        if resp.is_error:
+            raise UploadError(f"{context} failed with status code {resp.status_code}: {resp.text}")
 
     def get_upload_json(self, file_path, folder_id, distant_filename=None):
         file_size = os.path.getsize(file_path)
@@ -33,13 +75,7 @@ class DocumentInterface:
         }
 
         req_url = urljoin(self.__server_base_url, "/api/docman_folders/") + str(folder_id) + "/files"
-        try:
-            resp = requests.post(req_url, json=req_payload, headers=self.__req_headers, verify=False)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-        return resp.json()
+        return self.__post_json(req_url, req_payload, f"Create upload of {base_name} in folder {folder_id}")
 
     def get_new_upload_json(self, file_path, file_id=None):
         file_size = os.path.getsize(file_path)
@@ -57,31 +93,62 @@ class DocumentInterface:
         }
 
         req_url = urljoin(self.__server_base_url, "/api/docman_files/") + str(file_id) + "/versions"
-
-        try:
-            resp = requests.post(req_url, json=req_payload, headers=self.__req_headers, verify=False)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            print(f"Response: {resp.text}")
-            raise
-
-        return resp.json()
+        return self.__post_json(req_url, req_payload, f"Create new version of {file_name} for file {file_id}")
 
     def push_upload(self, up_href:str, file_path:str):
-        base_name = os.path.basename(file_path)
+        """Sends the file to an upload created by Tuleap with the TUS protocol, resuming from the offset known by the server."""
         upload_url = urljoin(self.__server_base_url, up_href)
         up_headers = {
-            "Content-Type": "application/offset+octet-stream",
-            "Tus-Resumable": "1.0.0",
+            "Tus-Resumable": TUS_VERSION,
             "X-Auth-AccessKey": self.__server_auth_token
         }
-        tus_client = client.TusClient(upload_url, headers=up_headers)
+        offset = self.__server_offset(upload_url, up_headers)
+        file_size = os.path.getsize(file_path)
+        retries = 0
 
         with open(file_path, 'rb') as f:
-            uploader = Uploader(client=tus_client, file_stream=f, url=upload_url,
-                                chunk_size=CHUNK_SIZE, metadata={"filename": base_name}, verify_tls_cert=False)
-            uploader.upload()
+            while offset < file_size:
+                f.seek(offset)
+                chunk = f.read(CHUNK_SIZE)
+                try:
+                    resp = self.__session().patch(upload_url, content=chunk, headers={**up_headers,
+                                                                                    "Content-Type": "application/offset+octet-stream",
+                                                                                    "Upload-Offset": str(offset)})
+                except httpx.HTTPError as e:
+                    raise UploadError(f"Upload {upload_url}: PATCH at offset {offset} failed: {e}") from e
+                self.__raise_for_status(resp, f"Upload {upload_url}: PATCH at offset {offset}")
+                new_offset = self.__upload_offset(resp, upload_url)
+                if new_offset > file_size:
+                    raise UploadError(f"Upload {upload_url}: server offset {new_offset} is past the file size {file_size}")
+                if new_offset > offset:
+                    offset = new_offset
+                    retries = 0
+                    continue
+
+                # No progress: resume from the offset the server really has, a bounded number of times
+                retries += 1
+                if retries > MAX_UPLOAD_RETRIES:
+                    raise UploadError(f"Upload {upload_url}: stuck at offset {offset} of {file_size} after {MAX_UPLOAD_RETRIES} retries")
+                offset = self.__server_offset(upload_url, up_headers)
+
+    def __server_offset(self, upload_url, up_headers) -> int:
+        try:
+            resp = self.__session().head(upload_url, headers=up_headers)
+        except httpx.HTTPError as e:
+            raise UploadError(f"Upload {upload_url}: HEAD failed: {e}") from e
+        self.__raise_for_status(resp, f"Upload {upload_url}: HEAD")
+        return self.__upload_offset(resp, upload_url)
+
+    @staticmethod
+    def __upload_offset(resp, upload_url) -> int:
+        value = resp.headers.get("Upload-Offset")
+        try:
+            offset = int(value)
+        except (TypeError, ValueError):
+            raise UploadError(f"Upload {upload_url}: {resp.request.method} response has no valid Upload-Offset header ({value!r})") from None
+        if offset < 0:
+            raise UploadError(f"Upload {upload_url}: {resp.request.method} response has a negative Upload-Offset ({offset})")
+        return offset
 
     def update_file(self, file_path, file_id):
         up_json = self.get_new_upload_json(file_path, file_id)
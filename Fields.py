@@ -2,6 +2,7 @@ from enum import Enum
 from .utils import iso_to_datetime, datetime_to_iso
 from datetime import datetime
 from typing import List, Self
+from types import MappingProxyType
 import re
 import copy
 
@@ -27,6 +28,7 @@ class Field_type():
     LUBY = "luby"
 
 class Field:
+    __slots__ = ("__id", "__slug", "_updated", "_dependent", "__fieldType")
     def __init__(self, id=None, slug=None, fieldType=Field_type.NONE):
         self.__id= id
         self.__slug = slug
@@ -71,6 +73,7 @@ class Field:
         return {}
 
 class Field_string(Field):
+    __slots__ = ("__value",)
     def __init__(self, id=None, slug=None, value=None, fieldType=Field_type.STRING):
         """
             Initialize a new instance of the class.
@@ -102,6 +105,7 @@ class Field_text(Field_string):
         HTML = "html"
         MDWN = "markdown"
 
+    __slots__ = ("__tFormat",)
     def __init__(self, id=None, slug=None, value=None, t_format=Tformat.TEXT):
         super().__init__(id, slug, value, Field_type.TEXT)
         self.__tFormat = t_format
@@ -126,6 +130,7 @@ class Field_buttons(Field_text):
     BT_SEARCH_PATTERN = r'<a.*?>.*?</a>'
     ALIGN_SEARCH_PATTERN = r'<div style=".*?text-align:\s*([^;]+).*?"'
 
+    __slots__ = ("__buttonList", "__alignment")
     def __init__(self, id=None, slug=None, value=None, t_format=Field_text.Tformat.HTML):
         super().__init__(id, slug, value, Field_type.BUTTONS)
         self.__buttonList = []
@@ -188,6 +193,7 @@ class Field_artLinks(Field):
             OPEN_SOFTWARE_RIGHTS = "open_software_rights"
             RELATE_TO = "rel_to"
 
+        __slots__ = ("__id_artifact", "__id_tracker", "__direction", "__relation", "__updated")
         def __init__(self, id_artifact, id_tracker=None, direction=Direction.FORWARD, relation=Relation.NONE, isNew=False):
             self.__id_artifact = id_artifact
             self.__id_tracker = id_tracker
@@ -255,26 +261,66 @@ class Field_artLinks(Field):
         def json(self):
             return {"id":self.__id_artifact, "direction":self.__direction, "type":self.__relation}
 
+    __slots__ = ("__links", "__by_artifact", "__by_tracker", "__next_key")
     def __init__(self, id=None, slug=None, value=[]):
+        """
+            Links are kept in insertion order. The indexes by linked artifact ID and by tracker ID
+            are only built on the first change or lookup, a field that is only read stays a tuple.
+            Change links through the field: the indexes do not follow in-place changes of
+            a link's id_artifact or id_tracker.
+        """
         super().__init__(id, slug, Field_type.ARTLINKS)
-        self.__artLinks:List[Field_artLinks.ArtLink] = value
+        self.__set_unindexed(value)
+
+    def __set_unindexed(self, links):
+        self.__links:tuple[Field_artLinks.ArtLink, ...] | dict[int, Field_artLinks.ArtLink] = tuple(links)
+        self.__by_artifact:dict[int, dict[int, Field_artLinks.ArtLink]] = None
+        self.__by_tracker:dict[int, dict[int, Field_artLinks.ArtLink]] = None
+        self.__next_key = 0
+
+    def __indexed(self):
+        if self.__by_artifact is None:
+            links = self.__links
+            self.__links = {}
+            self.__by_artifact = {}
+            self.__by_tracker = {}
+            for link in links:
+                self.__index(link)
+
+    def __all_links(self):
+        return self.__links.values() if self.__by_artifact is not None else self.__links
+
+    def __index(self, link:ArtLink):
+        key = self.__next_key
+        self.__next_key += 1
+        self.__links[key] = link
+        self.__by_artifact.setdefault(link.id_artifact, {})[key] = link
+        self.__by_tracker.setdefault(link.id_tracker, {})[key] = link
+
+    def __unindex(self, key, link:ArtLink):
+        del self.__links[key]
+        for index, value in ((self.__by_artifact, link.id_artifact), (self.__by_tracker, link.id_tracker)):
+            bucket = index[value]
+            del bucket[key]
+            if not bucket:
+                del index[value]
 
     @property
-    def artLinks(self):
-        return self.__artLinks
+    def artLinks(self) -> tuple:
+        """Read-only: change the links with add_link/remove_link/set_links, or assign a new list."""
+        return tuple(self.__all_links())
     @artLinks.setter
     def artLinks(self, links_list:List[ArtLink]):
-        self.__artLinks = links_list
+        self.__set_unindexed(links_list)
         self.updated = True
 
-    @property
     def get_link(self, index):
         return self.artLinks[index]
 
     @property
     def updated(self):
         result = self._updated
-        for iLink in self.__artLinks:
+        for iLink in self.__all_links():
             if iLink.updated:
                 result = True
 
@@ -284,46 +330,84 @@ class Field_artLinks(Field):
         self._updated = value
 
     def add_link(self, link:ArtLink):
-        if link not in [item for item in self.__artLinks]:
+        self.__indexed()
+        same_artifact = self.__by_artifact.get(link.id_artifact, {})
+        if link not in same_artifact.values():
             # Prevent multiple link of different type
             self.remove_link(artifact_id=link.id_artifact)
             indep_link = copy.copy(link)
             indep_link.updated = True
-            self.__artLinks.append(indep_link)
+            self.__index(indep_link)
 
     def add_links(self, links:List[ArtLink]):
         for link in links:
             self.add_link(link)
 
-    def remove_link(self, artLink:ArtLink=None, artifact_id:int=None):
-        if artLink and (artLink in self.artLinks):
-            self.__artLinks.remove(artLink)
+    def set_links(self, links:List[ArtLink]):
+        """
+            Replaces all the links at once, same result as clear_links then add_links: one link
+            per artifact, the last one given wins. The links already there are kept as is, the
+            others are added as new links.
+        """
+        self.__indexed()
+        final = {}
+        for link in links:
+            final.pop(link.id_artifact, None)
+            final[link.id_artifact] = link
+
+        result = []
+        kept = 0
+        for artifact_id, link in final.items():
+            current = list(self.__by_artifact.get(artifact_id, {}).values())
+            if current == [link]:
+                result.append(current[0])
+                kept += 1
+            else:
+                indep_link = copy.copy(link)
+                indep_link.updated = True
+                result.append(indep_link)
+
+        if kept != len(self.__links):
             self.updated = True
+        self.__set_unindexed(result)
+
+    def remove_link(self, artLink:ArtLink=None, artifact_id:int=None):
+        self.__indexed()
+        if artLink:
+            # Like list.remove, an artifact ID matches its first link
+            artifact_key = artLink if isinstance(artLink, int) else artLink.id_artifact
+            for key, link in self.__by_artifact.get(artifact_key, {}).items():
+                if link == artLink:
+                    self.__unindex(key, link)
+                    self.updated = True
+                    break
         elif artifact_id:
-            for link in self.__artLinks:
-                if link.id_artifact == artifact_id:
-                    self.remove_link(link)
+            for key, link in list(self.__by_artifact.get(artifact_id, {}).items()):
+                self.__unindex(key, link)
+                self.updated = True
 
     def clear_links(self):
-        self.__artLinks.clear()
+        self.__set_unindexed(())
         self.updated = True
 
+    def from_artifact_id(self, artifact_id:int) -> list[ArtLink]:
+        self.__indexed()
+        return list(self.__by_artifact.get(artifact_id, {}).values())
+
     def from_tracker_id(self, tracker_id:int) -> list[ArtLink]:
-        result = []
-        for link in self.artLinks:
-            if (link.id_tracker == tracker_id):
-                result.append(link)
-        return result
+        self.__indexed()
+        return list(self.__by_tracker.get(tracker_id, {}).values())
 
     def print_links(self):
-        for link in self.artLinks:
+        for link in self.__all_links():
             print('-->',str(link))
 
     def toJson(self):
-        return {"field_id":self.id, "all_links":[item.json() for item in self.__artLinks]}
+        return {"field_id":self.id, "all_links":[item.json() for item in self.__all_links()]}
 
 class Field_files(Field):
     class File:
+        __slots__ = ("__id", "__name", "__description", "__html_url")
         def __init__(self, id=None, name=None, description=None, html_url=None):
             self.__id = id
             self.__name = name
@@ -350,6 +434,7 @@ class Field_files(Field):
         def description(self):
             return self.__description
 
+    __slots__ = ("__files",)
     def __init__(self, id=None, slug=None, file_descriptions=None):
         super().__init__(id, slug, Field_type.FILES)
         self.__files:list[Field_files.File] = []
@@ -386,6 +471,8 @@ class Field_files(Field):
 
 class Field_msb(Field):
     class Selectable_item:
+        """Immutable: the items of the tracker values are interned by Value_maps and shared by all the fields."""
+        __slots__ = ("__id", "__label")
         def __init__(self, id:int, label:str):
             self.__id = id
             self.__label = label
@@ -393,16 +480,10 @@ class Field_msb(Field):
         @property
         def id(self):
             return self.__id
-        @id.setter
-        def id(self, id):
-            self.__id = id
 
         @property
         def label(self):
             return self.__label
-        @label.setter
-        def label(self, label):
-            self.__label = label
 
         def __eq__(self, value:Self):
             if type(self) == type(value):
@@ -411,48 +492,112 @@ class Field_msb(Field):
             else:
                 return False
 
+        def __hash__(self):
+            return hash((self.__id, self.__label))
+
+    class Value_maps:
+        """
+            Label/ID lookups of a list field. Built once per tracker field by the TrackerStruct and
+            shared read-only by all the Field_msb instances of that field.
+        """
+        def __init__(self, field_struct):
+            values = field_struct.get("values", ())
+            label_to_id = {field['label']: field['id'] for field in values}
+            label_to_id[""] = Field_msb.EMPTY_FIELD_VID
+            id_to_label = {field['id']: field['label'] for field in values}
+            id_to_label[Field_msb.EMPTY_FIELD_VID] = ""
+            self.label_to_id = MappingProxyType(label_to_id)
+            self.id_to_label = MappingProxyType(id_to_label)
+            self.__items = {Field_msb.EMPTY_FIELD_VID: Field_msb.EMPTY_SELECTABLE_ITEM}
+
+        def item(self, id, label) -> "Field_msb.Selectable_item":
+            """Shared Selectable_item of a value of the tracker, a new one if the label is not the tracker's."""
+            item = self.__items.get(id)
+            if item is not None and item.label == label:
+                return item
+            item = Field_msb.Selectable_item(id, label)
+            if self.id_to_label.get(id) == label:
+                self.__items[id] = item
+            return item
+
     EMPTY_FIELD_VID = 100
     EMPTY_SELECTABLE_ITEM = Selectable_item(id=EMPTY_FIELD_VID, label="")
-    def __init__(self, id, slug, field_struct, values=[], fieldType=Field_type.MSB):
+    EMPTY_SELECTION = (EMPTY_SELECTABLE_ITEM,)
+    # Selections are almost always 1 or 2 values, kept in a compact tuple. Above this size they
+    # move to a dict by value ID for O(1) add/remove/contains. Both keep the selection order.
+    SELECTION_DICT_THRESHOLD = 8
+    __slots__ = ("__field_struct", "_values", "_value_maps", "_legal")
+    def __init__(self, id, slug, field_struct, values=[], fieldType=Field_type.MSB, value_maps:Value_maps=None):
         super().__init__(id, slug, fieldType)
         self.__field_struct = field_struct
-        self._values:list[Field_msb.Selectable_item] = [self.EMPTY_SELECTABLE_ITEM]
-        self._label_to_id = {field['label']: field['id'] for field in field_struct["values"]}
-        self._label_to_id[""] = self.EMPTY_FIELD_VID
-        self._id_to_label = {field['id']: field['label'] for field in field_struct["values"]}
-        self._id_to_label[self.EMPTY_FIELD_VID] = ""
+        self._values:tuple[Field_msb.Selectable_item, ...] | dict[int, Field_msb.Selectable_item] = ()
+        if value_maps is None:
+            value_maps = Field_msb.Value_maps(field_struct)
+        self._value_maps = value_maps
         self._legal = True
 
         if values:
             for item in values:
                 if item["id"] == None:
                     pass
-                else:
+                elif not self._is_selected(item["id"]):
                     if("label" in item.keys()):
-                        self._values.append(Field_msb.Selectable_item(item["id"], item["label"]))
+                        self._select(value_maps.item(item["id"], item["label"]))
                     else:
-                        self._values.append(Field_msb.Selectable_item(item["id"], item["username"])) #TODO: FIXME
+                        self._select(value_maps.item(item["id"], item["username"])) #TODO: FIXME
 
-        if not self.isEmpty():
-            self._values.remove(self.EMPTY_SELECTABLE_ITEM)
+        if not self._values:
+            self._values = self.EMPTY_SELECTION
 
         def __str__(self):
             return "id:{}; label:{}".format(self.id, self.label)
 
+    @property
+    def _label_to_id(self):
+        return self._value_maps.label_to_id
+
+    @property
+    def _id_to_label(self):
+        return self._value_maps.id_to_label
+
+    def _selected_items(self):
+        return self._values.values() if isinstance(self._values, dict) else self._values
+
+    def _is_selected(self, id) -> bool:
+        if isinstance(self._values, dict):
+            return id in self._values
+        return any(item.id == id for item in self._values)
+
+    def _select(self, item:Selectable_item):
+        """Appends an item whose value ID is not selected yet."""
+        if isinstance(self._values, dict):
+            self._values[item.id] = item
+        elif len(self._values) < self.SELECTION_DICT_THRESHOLD:
+            self._values += (item,)
+        else:
+            self._values = {selected.id: selected for selected in self._values}
+            self._values[item.id] = item
+
+    def _unselect(self, id) -> bool:
+        """Returns False if the value ID was not selected."""
+        if isinstance(self._values, dict):
+            return self._values.pop(id, None) is not None
+        kept = tuple(item for item in self._values if item.id != id)
+        removed = len(kept) != len(self._values)
+        self._values = kept
+        return removed
+
     def add_selectable_item(self, inSelectableItem:Selectable_item):
         # Adding empty means clearing
         if (inSelectableItem == self.EMPTY_SELECTABLE_ITEM):
             self.clearValues()
             return
 
-        if (self.EMPTY_SELECTABLE_ITEM in self._values):
-            if (inSelectableItem == self.EMPTY_SELECTABLE_ITEM):
-                return
-            else:
-                self._values.remove(self.EMPTY_SELECTABLE_ITEM)
+        if self.isEmpty():
+            self._values = ()
 
-        if inSelectableItem not in self._values:
-            self._values.append(inSelectableItem)
+        if not self._is_selected(inSelectableItem.id):
+            self._select(inSelectableItem)
             self.updated = True
 
     def add(self, id=None, label=None):
@@ -461,9 +606,9 @@ class Field_msb(Field):
 
         new_sb = None
         if id:
-            new_sb = Field_msb.Selectable_item(id, self._id_to_label[id])
+            new_sb = self._value_maps.item(id, self._id_to_label[id])
         elif label:
-            new_sb = Field_msb.Selectable_item(self._label_to_id[label], label)
+            new_sb = self._value_maps.item(self._label_to_id[label], label)
 
         self.add_selectable_item(new_sb)
 
@@ -476,16 +621,22 @@ class Field_msb(Field):
                 self.add(label=label)
 
     def remove(self, id=None, label=None):
+        if label and not id:
+            id = self._label_to_id[label]
         if id:
-            self._values.remove(Field_msb.Selectable_item(id, self.__id_to_label[id]))
-        elif label:
-            self._values.remove(Field_msb.Selectable_item(self.__label_to_id[label]), label)
+            if not self._unselect(id):
+                raise ValueError(f"Value {id} is not selected in field {self.slug}")
         self.updated = True
 
+    def contains(self, id=None, label=None) -> bool:
+        if label and not id:
+            id = self._label_to_id.get(label)
+        return self._is_selected(id)
+
     def clearValues(self):
         if self.isEmpty():
             return
-        self._values = [self.EMPTY_SELECTABLE_ITEM]
+        self._values = self.EMPTY_SELECTION
         self.updated = True
 
     @property
@@ -497,20 +648,23 @@ class Field_msb(Field):
         self.updated = True
 
     def isEmpty(self):
-        return (self._values == [self.EMPTY_SELECTABLE_ITEM])
+        return (len(self._values) == 1 and self._first_item() == self.EMPTY_SELECTABLE_ITEM)
 
     def fillIfEmpty(self, id=None, label=None):
         if self.isEmpty():
             self.add(id=id, label=label)
 
     def bind_values(self, non_empty_only=False):
-        res = [item.id for item in self._values]
+        res = [item.id for item in self._selected_items()]
         if non_empty_only and self.EMPTY_FIELD_VID in res:
             res.remove(self.EMPTY_FIELD_VID)
         return res
 
     def labels(self):
-        return [item.label for item in self._values]
+        return [item.label for item in self._selected_items()]
+
+    def _first_item(self) -> Selectable_item:
+        return next(iter(self._selected_items()))
 
     def __str__(self):
             return self._values
@@ -522,23 +676,25 @@ class Field_msb(Field):
         return self.__field_struct
 
 class Field_sb(Field_msb):
-    def __init__(self, id, slug, field_struct, values=None, fieldType=Field_type.SB):
-        super().__init__(id, slug, field_struct, values, fieldType)
+    __slots__ = ()
+    def __init__(self, id, slug, field_struct, values=None, fieldType=Field_type.SB, value_maps:Field_msb.Value_maps=None):
+        super().__init__(id, slug, field_struct, values, fieldType, value_maps)
 
     def set(self, id=None, label=None):
         self.clearValues()
         self.add(id, label)
 
     def value_id(self):
-        return self._values[0].id
+        return self._first_item().id
 
     def value_label(self):
-        return self._values[0].label
+        return self._first_item().label
 
 class Field_users(Field_msb):
     GENERIC_USER_LABEL = "generic_user_label"
-    def __init__(self, id, slug, field_struct, values=[], fieldType=Field_type.USERS):
-        super().__init__(id, slug, field_struct, values, fieldType=fieldType)
+    __slots__ = ()
+    def __init__(self, id, slug, field_struct, values=[], fieldType=Field_type.USERS, value_maps:Field_msb.Value_maps=None):
+        super().__init__(id, slug, field_struct, values, fieldType=fieldType, value_maps=value_maps)
 
     def add(self, id):
         if not id:
@@ -547,7 +703,7 @@ class Field_users(Field_msb):
         if (id in self._id_to_label.keys()):
             new_label = self._id_to_label[id]
 
-        new_user = Field_msb.Selectable_item(id=id, label=new_label)
+        new_user = self._value_maps.item(id, new_label)
 
         self.add_selectable_item(new_user)
 
@@ -558,9 +714,7 @@ class Field_users(Field_msb):
 
     def remove(self, id):
         if id:
-            for curUser in self._values():
-                if id == curUser.id:
-                    self._values.remove(curUser)
+            self._unselect(id)
         self.updated = True
 
     def fillIfEmpty(self, id):
@@ -574,22 +728,23 @@ class Field_users(Field_msb):
         return None
 
 class Field_user(Field_users):
-    def __init__(self, id, slug, field_struct, values=None, fieldType=Field_type.USER):
-        super().__init__(id, slug, field_struct, values, fieldType=fieldType)
+    __slots__ = ()
+    def __init__(self, id, slug, field_struct, values=None, fieldType=Field_type.USER, value_maps:Field_msb.Value_maps=None):
+        super().__init__(id, slug, field_struct, values, fieldType=fieldType, value_maps=value_maps)
 
     def set(self, id):
         self.clearValues()
         self.add(id)
 
     def value_id(self):
-        return self._values[0].id
+        return self._first_item().id
 
     def value_label(self):
-        return self._values[0].label
+        return self._first_item().label
 
     def get_user_reference(self, id=None):
         if not id and (len(self._values) > 0):
-            id = self._values[0].id
+            id = self._first_item().id
         return super().get_user_reference(id)
 
     def get_user_real_name(self, id=None):
@@ -599,6 +754,7 @@ class Field_user(Field_users):
         return 'unknown_user'
 
 class Field_float(Field):
+    __slots__ = ("__value",)
     def __init__(self, id=None, slug=None, value=None):
         """
             Initialize a new instance of the class.
@@ -623,6 +779,7 @@ class Field_float(Field):
         return {"field_id":self.id,"value":self.value}
 
 class Field_date(Field):
+    __slots__ = ("__value",)
     def __init__(self, id=None, slug=None, value=None):
         """
             Initialize a new instance of the class.
@@ -636,7 +793,6 @@ class Field_date(Field):
         super().__init__(id, slug, Field_type.DATE)
         parsed_datetime = iso_to_datetime(value)
         self.__value = parsed_datetime
-        self.__fieldType = Field_type.DATE
 
     @property
     def value(self) -> datetime:
@@ -655,14 +811,21 @@ class Field_date(Field):
     def toJson(self):
         return {"field_id":self.id,"value":datetime_to_iso(self.value)}
 
-def get_empty_field(field_type:Field_type=None, field_id=None, field_slug=None, field_struct=None) -> Field:
+def is_user_list(field_struct) -> bool:
+    """Tells from the tracker struct if a list field is bound to users rather than to static values."""
+    bindings = field_struct.get("bindings")
+    if bindings and bindings.get("type"):
+        return bindings["type"] == "users"
+    values = field_struct.get("values") or []
+    return (not values) or ("username" in values[0]) or ("user_reference" in values[0])
+
+def get_empty_field(field_type:Field_type=None, field_id=None, field_slug=None, field_struct=None, value_maps:Field_msb.Value_maps=None) -> Field:
     if field_struct:
         field_id = field_struct["field_id"]
         field_type = field_struct["type"]
         field_slug = field_struct["name"]
         if field_type in (Field_type.MSB, Field_type.SB):
-            if (((not field_struct["values"]==[]) and ("username" in field_struct["values"][0])) or
-                field_struct["values"]==[]):
+            if is_user_list(field_struct):
                 if field_type == Field_type.MSB:
                     field_type = Field_type.USERS
                 elif field_type == Field_type.SB:
@@ -681,14 +844,14 @@ def get_empty_field(field_type:Field_type=None, field_id=None, field_slug=None,
     elif field_type == Field_type.FILES:
         return Field_files(id=field_id, slug=field_slug)
     elif field_type in (Field_type.MSB, Field_type.CB):
-        return Field_msb(id=field_id, slug=field_slug, field_struct=field_struct, fieldType=field_type)
+        return Field_msb(id=field_id, slug=field_slug, field_struct=field_struct, fieldType=field_type, value_maps=value_maps)
     elif field_type in (Field_type.SB, Field_type.RB):
-        return Field_sb(id=field_id, slug=field_slug, field_struct=field_struct, fieldType=field_type)
+        return Field_sb(id=field_id, slug=field_slug, field_struct=field_struct, fieldType=field_type, value_maps=value_maps)
     elif field_type in (Field_type.DATE, Field_type.SUBON, Field_type.LUD):
         return Field_date(id=field_id, slug=field_slug)
     elif field_type == Field_type.FLOAT:
         return Field_float(id=field_id, slug=field_slug)
     elif field_type in (Field_type.USER, Field_type.SUBBY, Field_type.LUBY):
-        return Field_user(id=field_id, slug=field_slug, field_struct=field_struct, fieldType=field_type)
+        return Field_user(id=field_id, slug=field_slug, field_struct=field_struct, fieldType=field_type, value_maps=value_maps)
     elif field_type == Field_type.USERS:
-        return Field_users(id=field_id, slug=field_slug, field_struct=field_struct)
\ No newline at end of file
+        return Field_users(id=field_id, slug=field_slug, field_struct=field_struct, value_maps=value_maps)
\ No newline at end of file
@@ -23,100 +23,133 @@ class Rule:
     def __repr__(self):
         return str(self)
 
+    def key(self) -> tuple:
+        return (self.source_field_id, self.source_value_id, self.target_field_id, self.target_value_id)
+
     def __eq__(self, value:Self):
-        return (self.source_field_id == value.source_field_id and
-                self.source_value_id == value.source_value_id and
-                self.target_field_id == value.target_field_id and
-                self.target_value_id == value.target_value_id)
+        if not isinstance(value, Rule):
+            return NotImplemented
+        return self.key() == value.key()
+
+    def __hash__(self):
+        return hash(self.key())
 
 class RuleSet:
+    """
+        Field dependency rules of a tracker, indexed when added so that every query is a dictionary
+        lookup. The lists and dicts returned are copies, the indexes cannot be modified through them.
+    """
     def __init__(self, in_rules):
+        self.__all_rules = []
+        self.__rules = set()
+        # (source field, source value) -> rules, and the same restricted to one target field
+        self.__rules_by_source = dict()
+        self.__rules_by_source_target = dict()
+        # (source field, source value) -> {target field: [target values]}
         self.__targets = dict()
+        # (target field, target value) -> {source field: [source values]}, and the same for any target value
         self.__sources = dict()
-        self.__all_rules = [Rule.from_json(raw_rule) for raw_rule in in_rules]
-        self.__dependent_field_ids = set()
-
-        for rule in self.__all_rules:
-            self.__dependent_field_ids.add(rule.source_field_id)
-            self.__dependent_field_ids.add(rule.target_field_id)
+        self.__sources_by_target_field = dict()
+        self.__source_field_ids = set()
+        self.__target_field_ids = set()
+        self.__target_fields_by_source_field = dict()
+        self.__dependent_field_ids = dict()
+        self.__field_ranks = None
+
+        for raw_rule in in_rules:
+            self.__index(Rule.from_json(raw_rule))
+
+    def __index(self, rule:Rule):
+        self.__all_rules.append(rule)
+        self.__rules.add(rule)
+        source = (rule.source_field_id, rule.source_value_id)
+        self.__rules_by_source.setdefault(source, []).append(rule)
+        self.__rules_by_source_target.setdefault(source + (rule.target_field_id,), []).append(rule)
+        self.__targets.setdefault(source, {}).setdefault(rule.target_field_id, []).append(rule.target_value_id)
+        self.__sources.setdefault((rule.target_field_id, rule.target_value_id), {}).setdefault(rule.source_field_id, []).append(rule.source_value_id)
+        self.__sources_by_target_field.setdefault(rule.target_field_id, {}).setdefault(rule.source_field_id, []).append(rule.source_value_id)
+        self.__source_field_ids.add(rule.source_field_id)
+        self.__target_field_ids.add(rule.target_field_id)
+        self.__target_fields_by_source_field.setdefault(rule.source_field_id, set()).add(rule.target_field_id)
+        self.__dependent_field_ids.clear()
+        self.__field_ranks = None
 
     def add_rule(self, new_rule:Rule):
-        if not new_rule in self.__all_rules:
-            self.__all_rules.append(new_rule)
-            self.__dependent_field_ids.add(new_rule.source_field_id)
-            self.__dependent_field_ids.add(new_rule.target_field_id)
-
-        if not new_rule.source_field_id in self.__targets.keys():
-            self.__targets[new_rule.source_field_id] = new_rule.to_first_rule()
-            return
-        if not new_rule.source_value_id in self.__targets[new_rule.source_field_id].keys():
-             self.__targets[new_rule.source_field_id][new_rule.source_value_id] = new_rule.to_second_level()
-             return
-        if not new_rule.target_field_id in self.__targets[new_rule.source_field_id][new_rule.source_value_id].keys():
-             self.__targets[new_rule.source_field_id][new_rule.source_value_id][new_rule.target_field_id] = [new_rule.target_value_id]
-             return
-        if not new_rule.target_value_id in self.__targets[new_rule.source_field_id][new_rule.source_value_id][new_rule.target_field_id]:
-            self.__targets[new_rule.source_field_id][new_rule.source_value_id][new_rule.target_field_id].append(new_rule.target_value_id)
-        return
+        if not new_rule in self.__rules:
+            self.__index(new_rule)
 
     def target_options(self, src_fid, src_vid, tgt_fid=None) -> list[Rule]:
-        result = []
-        for rule in self.__all_rules:
-            if (rule.source_field_id == src_fid and
-                rule.source_value_id == src_vid and
-                (not tgt_fid or rule.target_field_id == tgt_fid)):
-                result.append(rule)
-        return result
+        if tgt_fid:
+            return list(self.__rules_by_source_target.get((src_fid, src_vid, tgt_fid), ()))
+        return list(self.__rules_by_source.get((src_fid, src_vid), ()))
 
     def is_valid(self, source_field_id, source_value_id, target_field_id, target_value_id):
-        test_rule = Rule(source_field_id,
-                         source_value_id,
-                         target_field_id,
-                         target_value_id)
-
-        return test_rule in self.__all_rules
+        return Rule(source_field_id, source_value_id, target_field_id, target_value_id) in self.__rules
 
     def get_rule(self, index:int) -> Rule:
         if len(self.__all_rules) > index :
              return self.__all_rules[index]
 
-    def get_all_rules(self):
-         return self.__all_rules
+    def get_all_rules(self) -> list[Rule]:
+         return list(self.__all_rules)
 
-    def get_dependent_field_ids(self, source_only=False, target_only=False):
-        result = set()
+    def get_dependent_field_ids(self, source_only=False, target_only=False) -> frozenset:
         if source_only and not target_only:
-            for rule in self.__all_rules:
-                result.add(rule.source_field_id)
+            kind = "source"
         elif target_only:
-            for rule in self.__all_rules:
-                result.add(rule.target_field_id)
+            kind = "target"
         else:
-            for rule in self.__all_rules:
-                result.add(rule.source_field_id)
-                result.add(rule.target_field_id)
+            kind = "all"
+
+        result = self.__dependent_field_ids.get(kind)
+        if result is None:
+            if kind == "source":
+                result = frozenset(self.__source_field_ids)
+            elif kind == "target":
+                result = frozenset(self.__target_field_ids)
+            else:
+                result = frozenset(self.__source_field_ids | self.__target_field_ids)
+            self.__dependent_field_ids[kind] = result
         return result
 
-    def get_source_rules(self, in_target_field_id, in_target_value_id=None) -> dict:
-        result = dict()
-        for rule in self.__all_rules:
-            if (rule.target_field_id == in_target_field_id and
-                (rule.target_value_id == in_target_value_id or not in_target_value_id)):
-                if rule.source_field_id in result.keys():
-                    result[rule.source_field_id].append(rule.source_value_id)
-                else:
-                    result[rule.source_field_id] = [rule.source_value_id]
-        return result
+    def get_source_field_ids(self, target_field_id) -> tuple:
+        """Fields constraining the given target field."""
+        return tuple(self.__sources_by_target_field.get(target_field_id, ()))
+
+    def get_target_field_ids(self, source_field_id) -> tuple:
+        """Fields constrained by the given source field."""
+        return tuple(self.__target_fields_by_source_field.get(source_field_id, ()))
+
+    def get_field_ranks(self) -> dict:
+        """
+            Topological rank of each dependent field: a source always ranks lower than its targets.
+            Fields on a dependency cycle share the highest rank.
+        """
+        if self.__field_ranks is None:
+            remaining_sources = {field_id: len(self.__sources_by_target_field.get(field_id, ()))
+                                 for field_id in self.__source_field_ids | self.__target_field_ids}
+            ready = [field_id for field_id, count in remaining_sources.items() if count == 0]
+            ranks = dict()
+            while ready:
+                field_id = ready.pop()
+                ranks[field_id] = len(ranks)
+                for target_field_id in self.__target_fields_by_source_field.get(field_id, ()):
+                    remaining_sources[target_field_id] -= 1
+                    if remaining_sources[target_field_id] == 0:
+                        ready.append(target_field_id)
+            cycle_rank = len(ranks)
+            for field_id in remaining_sources:
+                ranks.setdefault(field_id, cycle_rank)
+            self.__field_ranks = ranks
+        return self.__field_ranks
 
+    def get_source_rules(self, in_target_field_id, in_target_value_id=None) -> dict:
+        if in_target_value_id:
+            sources = self.__sources.get((in_target_field_id, in_target_value_id), {})
+        else:
+            sources = self.__sources_by_target_field.get(in_target_field_id, {})
+        return {field_id: list(value_ids) for field_id, value_ids in sources.items()}
 
     def get_target_rules(self, in_source_field_id, in_source_value_id):
-        result = dict()
-        for rule in self.__all_rules:
-            if (rule.source_field_id == in_source_field_id and
-                rule.source_value_id == in_source_value_id):
-                if rule.target_field_id in result.keys():
-                    result[rule.target_field_id].append(rule.target_value_id)
-                else:
-                    result[rule.target_field_id] = [rule.target_value_id]
-
-        return result
+        targets = self.__targets.get((in_source_field_id, in_source_value_id), {})
+        return {field_id: list(value_ids) for field_id, value_ids in targets.items()}
@@ -3,7 +3,7 @@ from tuleap_wrapper import tuleap_endpoint as tue
 from typing import Self
 
 class User:
-    __tuleap_endpoint = tue.TuleapEndpoint()
+    __tuleap_endpoint = tue.LazyEndpoint()
     id = None
     real_name = None
     username = None
@@ -34,6 +34,11 @@ class User:
         json_user = cls.__tuleap_endpoint.get_user_by_id(id)
         return cls.from_json(json_user)
 
+    @classmethod
+    def from_ids(cls, ids) -> dict[int, Self]:
+        """Resolves many users keyed by ID, with at most one request per distinct user not already cached."""
+        json_users = cls.__tuleap_endpoint.get_users_by_ids(ids)
+        return {user_id: cls.from_json(json_user) for user_id, json_user in json_users.items()}
 
     def get_field(self, fieldSlug) -> Field:
         if not fieldSlug in self.__raw_fields.keys():
@@ -3,7 +3,7 @@ from tuleap_wrapper import tuleap_endpoint as tue
 from typing import Self
 
 class UserGroup:
-    __tuleap_endpoint = tue.TuleapEndpoint()
+    __tuleap_endpoint = tue.LazyEndpoint()
 
     def __init__(self, id:int, user_id_list=[]):
         self.__id :int = id
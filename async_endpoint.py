@@ -0,0 +1,174 @@
+import asyncio
+import time
+import httpx
+from tuleap_wrapper import tuleap_endpoint as tue
+from tuleap_wrapper.limiter import THROTTLING_STATUS_CODES, backoff_delay, parse_retry_after
+from tuleap_wrapper.metrics import OperationEvent
+from tuleap_wrapper.single_flight import AsyncSingleFlight
+
+class AsyncTuleapEndpoint:
+    """
+        Asyncio counterpart of TuleapEndpoint.
+
+        Uses the configuration set by `TuleapEndpoint.configure`, HTTP settings included, and sends
+        its requests through one pooled httpx.AsyncClient. At most `max_in_flight` requests are
+        sent at the same time, the others wait for a free slot.
+
+        Requests go through the same hooks as the synchronous endpoint: they are reported to its
+        metrics sinks, share its adaptive limiter (429/Retry-After handling, GET retries) and
+        its response cache for conditional requests. Errors raise HTTPError with the response.
+
+        Use it as an async context manager so the connection pool is closed:
+
+            async with AsyncTuleapEndpoint(max_in_flight=32) as endpoint:
+                artifacts = await endpoint.get_artifacts_by_id_list([1, 2, 3])
+    """
+    DEFAULT_MAX_IN_FLIGHT = 16
+    LIMITER_POLL_INTERVAL = 0.01
+    USERS_PAGE_SIZE = 50
+
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        if tue.TuleapEndpoint.base_url is None or tue.TuleapEndpoint.auth_token is None:
+            raise ConnectionError("AsyncTuleapEndpoint: TuleapEndpoint not configured. Please call `TuleapEndpoint.configure` first.")
+
+        self.__semaphore = asyncio.Semaphore(max_in_flight)
+        # Coalesces identical GETs in flight on this endpoint, its stats() tell how many requests were saved
+        self.single_flight = AsyncSingleFlight()
+        self.__client = httpx.AsyncClient(base_url=tue.TuleapEndpoint.api_url,
+                                          **tue.TuleapEndpoint.http_client_settings(pool_size=max_in_flight))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.__client.aclose()
+
+    async def _request(self, operation, method, relative_url, error_context, params=None, json=None, cacheable=False) -> httpx.Response:
+        """Sends one request, identical GETs already in flight share a single request."""
+        if method == "GET":
+            return await self.single_flight.do(tue.TuleapEndpoint._request_key(relative_url, params),
+                                               self._send, operation, method, relative_url, error_context, params, json, cacheable)
+        return await self._send(operation, method, relative_url, error_context, params, json, cacheable)
+
+    async def _send(self, operation, method, relative_url, error_context, params=None, json=None, cacheable=False) -> httpx.Response:
+        """Same as TuleapEndpoint._send."""
+        endpoint = tue.TuleapEndpoint
+        cache_key, cached = endpoint._cache_lookup(relative_url, params, cacheable)
+        headers = cached.conditional_headers() if cached else None
+
+        event = OperationEvent(operation, 0.0)
+        start = time.monotonic()
+        try:
+            response = await self._send_with_retries(event, method, relative_url, params, json, headers)
+            return endpoint._handle_response(event, response, error_context, cache_key, cached)
+        except httpx.TransportError:
+            event.error = True
+            raise
+        finally:
+            event.latency = time.monotonic() - start
+            endpoint.record_operation(event)
+
+    async def _send_with_retries(self, event:OperationEvent, method, relative_url, params=None, json=None, headers=None) -> httpx.Response:
+        """Same as TuleapEndpoint._send_with_retries, waiting for the limiter without blocking the event loop."""
+        limiter = tue.TuleapEndpoint.limiter
+        max_retries = tue.TuleapEndpoint.max_retries
+        attempt = 0
+        while True:
+            async with self.__semaphore:
+                ticket = await self.__acquire(limiter)
+                event.requests += 1
+                start = time.monotonic()
+                response = None
+                throttled = False
+                retry_after = None
+                try:
+                    response = await self.__client.request(method, relative_url, params=params, json=json, headers=headers)
+                    throttled = response.status_code in THROTTLING_STATUS_CODES
+                    retry_after = parse_retry_after(response.headers.get("Retry-After")) if throttled else None
+                except httpx.TransportError:
+                    if method != "GET" or attempt >= max_retries:
+                        raise
+                finally:
+                    limiter.release(ticket, time.monotonic() - start, throttled=throttled,
+                                    retry_after=retry_after, failed=response is None)
+            if response is not None and (not throttled or method != "GET" or attempt >= max_retries):
+                return response
+
+            limiter.record_retry()
+            event.retries += 1
+            await asyncio.sleep(backoff_delay(attempt, retry_after=retry_after))
+            attempt += 1
+
+    async def __acquire(self, limiter):
+        while True:
+            ticket, wait = limiter.try_acquire()
+            if ticket is not None:
+                return ticket
+            await asyncio.sleep(wait if wait is not None else self.LIMITER_POLL_INTERVAL)
+
+    async def get_artifact_by_id(self, artifact_id):
+        response = await self._request("get_artifact", "GET", f"artifacts/{artifact_id}", f"Get artifact {str(artifact_id)}", cacheable=True)
+        return response.json()
+
+    async def get_artifacts_by_id_list(self, artifact_ids):
+        """Fetches all the artifacts concurrently, results are returned in input order."""
+        return await asyncio.gather(*[self.get_artifact_by_id(artifact_id) for artifact_id in artifact_ids])
+
+    async def get_tracker_struct_by_id(self, tracker_id):
+        response = await self._request("get_tracker_struct", "GET", f"trackers/{tracker_id}", f"Get tracker struct {str(tracker_id)}", cacheable=True)
+        return response.json()
+
+    async def update_artifact_by_id(self, artifact_id, values):
+        await self._request("update_artifact", "PUT", f"artifacts/{artifact_id}", f"Update artifact {str(artifact_id)}",
+                            json={"values": values})
+        return True
+
+    async def create_artifact(self, tracker_id, values_by_field=None, values=None):
+        payload = {"tracker": {"id": tracker_id}}
+        if values_by_field:
+            payload["values_by_field"] = values_by_field
+        else:
+            payload["values"] = values
+        await self._request("create_artifact", "POST", "artifacts", f"Create artifact on tracker {str(tracker_id)}", json=payload)
+        return True
+
+    async def get_user_by_id(self, user_id):
+        response = await self._request("get_user", "GET", f"users/{user_id}", f"Get user {str(user_id)}")
+        return response.json()
+
+    async def get_user_group_by_id(self, group_id):
+        response = await self._request("get_user_group", "GET", f"user_groups/{group_id}", f"Get user group {str(group_id)}")
+        return response.json()
+
+    async def get_users_in_group(self, group_id):
+        result = []
+        offset = 0
+        while True:
+            response = await self._request("get_users_in_group", "GET", f"user_groups/{group_id}/users", f"Get users in group {str(group_id)}",
+                                           params={"limit": self.USERS_PAGE_SIZE, "offset": offset})
+            page = response.json()
+            result += page
+            offset += len(page)
+            total = int(response.headers.get("X-PAGINATION-SIZE", offset))
+            if not page or offset >= total:
+                return result
+
+    async def set_users_in_group(self, group_id, user_ids):
+        await self._request("set_users_in_group", "PUT", f"user_groups/{group_id}/users", f"Set users in group {str(group_id)}",
+                            json={"user_references": [{"id": user_id} for user_id in user_ids]})
+        # The membership cached by TuleapEndpoint is out of date now
+        if tue.TuleapEndpoint.user_cache is not None:
+            tue.TuleapEndpoint.user_cache.invalidate(("users_in_group", group_id))
+        return True
+
+    # get_users_in_group is not cached here: add/remove always start from the current membership
+    async def add_users_in_group(self, group_id, user_ids):
+        current_ids = [user["id"] for user in await self.get_users_in_group(group_id)]
+        return await self.set_users_in_group(group_id, current_ids + [uid for uid in user_ids if uid not in current_ids])
+
+    async def remove_users_in_group(self, group_id, user_ids):
+        current_ids = [user["id"] for user in await self.get_users_in_group(group_id)]
+        return await self.set_users_in_group(group_id, [uid for uid in current_ids if uid not in user_ids])
@@ -0,0 +1,48 @@
+"""
+    Bulk operations on an artifact links field holding many links, such as a release or an epic:
+    add_links, set_links, remove_link and from_tracker_id.
+
+    Run with tuleap_wrapper importable, no Tuleap server is needed:
+        python benchmarks/bench_art_links.py --links 50000 --trackers 20
+"""
+import argparse
+import time
+
+from tuleap_wrapper.Fields import Field_artLinks
+
+ArtLink = Field_artLinks.ArtLink
+
+def links(first_id, count, trackers, relation=ArtLink.Relation.NONE):
+    return [ArtLink(artifact_id, artifact_id % trackers, ArtLink.Direction.FORWARD, relation)
+            for artifact_id in range(first_id, first_id + count)]
+
+def timed(label, operation):
+    start = time.perf_counter()
+    result = operation()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f}s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=50000)
+    parser.add_argument("--trackers", type=int, default=20)
+    args = parser.parse_args()
+    count = args.links
+    half = count // 2
+
+    field = Field_artLinks(1, "links")
+    timed(f"add_links, {count} new", lambda: field.add_links(links(1, count, args.trackers)))
+    timed(f"add_links, {count} already there", lambda: field.add_links(links(1, count, args.trackers)))
+    timed(f"add_links, {half} relation changes", lambda: field.add_links(links(1, half, args.trackers, ArtLink.Relation.CHILD)))
+    # Half of the links kept, half replaced by new artifacts
+    timed(f"set_links, {count} ({half} kept)", lambda: field.set_links(links(half + 1, count, args.trackers)))
+    found = timed(f"from_tracker_id x {args.trackers}",
+                  lambda: sum(len(field.from_tracker_id(tracker_id)) for tracker_id in range(args.trackers)))
+    assert found == count
+    timed(f"remove_link, {half} by artifact ID",
+          lambda: [field.remove_link(artifact_id=artifact_id) for artifact_id in range(half + 1, count + 1)])
+    timed("toJson", field.toJson)
+    print(f"{len(field.artLinks)} links left")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+    Decode throughput of Artifact.from_json, in artifacts per second, on a synthetic tracker of
+    300 fields of mixed types.
+
+    Run with tuleap_wrapper importable, no Tuleap server is needed:
+        python benchmarks/bench_decoders.py --fields 300 --artifacts 2000
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import synthetic
+from tuleap_wrapper.Artifact import Artifact
+from tuleap_wrapper.tracker_struct_manager import Tracker_struct_manager
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=300)
+    parser.add_argument("--artifacts", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = parser.parse_args()
+
+    struct = synthetic.mixed_tracker_struct(field_count=args.fields)
+    payloads = [synthetic.artifact(artifact_id, struct) for artifact_id in range(args.artifacts)]
+    Tracker_struct_manager.configure(cache_dir=tempfile.mkdtemp())
+    Tracker_struct_manager().set_ts(struct)
+    # Compiles the tracker struct outside of the timed runs
+    with contextlib.redirect_stdout(io.StringIO()):
+        Artifact.from_json(payloads[0])
+
+    best = None
+    for _ in range(args.repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for payload in payloads:
+                Artifact.from_json(payload)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"{args.fields} fields: {args.artifacts / best:,.0f} artifacts/s "
+          f"({best / args.artifacts * 1e6:.0f} us per artifact, {args.fields * args.artifacts / best:,.0f} fields/s)")
+
+if __name__ == "__main__":
+    main()
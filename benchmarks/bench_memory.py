@@ -0,0 +1,48 @@
+"""
+    Memory held by a loaded artifact set, in bytes per artifact, on a synthetic tracker dump of
+    fields of mixed types. Measured with tracemalloc: the retained allocations of the Artifact
+    objects, their fields and values, the raw JSON of the dump excluded.
+
+    Run with tuleap_wrapper importable, no Tuleap server is needed:
+        python benchmarks/bench_memory.py --fields 100 --artifacts 5000
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+import tracemalloc
+
+import synthetic
+from tuleap_wrapper.Artifact import Artifact
+from tuleap_wrapper.tracker_struct_manager import Tracker_struct_manager
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=100)
+    parser.add_argument("--artifacts", type=int, default=5000)
+    parser.add_argument("--lazy", action="store_true", help="load with Artifact.from_json(lazy=True)")
+    args = parser.parse_args()
+
+    struct = synthetic.mixed_tracker_struct(field_count=args.fields)
+    payloads = [synthetic.artifact(artifact_id, struct) for artifact_id in range(args.artifacts)]
+    Tracker_struct_manager.configure(cache_dir=tempfile.mkdtemp())
+    Tracker_struct_manager().set_ts(struct)
+    # Compiles the tracker struct and its shared value maps outside of the measure
+    with contextlib.redirect_stdout(io.StringIO()):
+        Artifact.from_json(payloads[0]).get_fields()
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        artifacts = [Artifact.from_json(payload, lazy=args.lazy) for payload in payloads]
+        elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mode = "lazy" if args.lazy else "eager"
+    print(f"{len(artifacts)} artifacts, {args.fields} fields, {mode}: {retained / len(artifacts):,.0f} bytes per artifact "
+          f"({retained / 2**20:.1f} MiB retained, {peak / 2**20:.1f} MiB peak, {elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+    RuleSet queries on a large field dependency table: indexed RuleSet against the linear scans
+    it replaced, on the lookups done by Artifact.check_dependencies and autocomplete_field.
+
+    Run with tuleap_wrapper importable, no Tuleap server is needed:
+        python benchmarks/bench_rule_set.py --rules 20000
+"""
+import argparse
+import random
+import time
+
+import synthetic
+from tuleap_wrapper.Rules import Rule, RuleSet
+
+class LinearRuleSet:
+    """Reference: the scanning implementation RuleSet had before it was indexed."""
+    def __init__(self, in_rules):
+        self.__all_rules = [Rule.from_json(raw_rule) for raw_rule in in_rules]
+
+    def target_options(self, src_fid, src_vid, tgt_fid=None):
+        return [rule for rule in self.__all_rules
+                if rule.source_field_id == src_fid and rule.source_value_id == src_vid and
+                (not tgt_fid or rule.target_field_id == tgt_fid)]
+
+    def is_valid(self, source_field_id, source_value_id, target_field_id, target_value_id):
+        return Rule(source_field_id, source_value_id, target_field_id, target_value_id) in self.__all_rules
+
+    def get_dependent_field_ids(self, source_only=False, target_only=False):
+        result = set()
+        for rule in self.__all_rules:
+            if not target_only:
+                result.add(rule.source_field_id)
+            if not source_only or target_only:
+                result.add(rule.target_field_id)
+        return result
+
+    def get_source_rules(self, in_target_field_id, in_target_value_id=None):
+        result = dict()
+        for rule in self.__all_rules:
+            if (rule.target_field_id == in_target_field_id and
+                (rule.target_value_id == in_target_value_id or not in_target_value_id)):
+                result.setdefault(rule.source_field_id, []).append(rule.source_value_id)
+        return result
+
+    def get_target_rules(self, in_source_field_id, in_source_value_id):
+        result = dict()
+        for rule in self.__all_rules:
+            if rule.source_field_id == in_source_field_id and rule.source_value_id == in_source_value_id:
+                result.setdefault(rule.target_field_id, []).append(rule.target_value_id)
+        return result
+
+def queries(raw_rules, count, seed=1):
+    rng = random.Random(seed)
+    return [rng.choice(raw_rules) for _ in range(count)]
+
+def workload(rule_set, picked):
+    """One round of each query per picked rule, as check_dependencies and autocomplete_field do."""
+    results = []
+    for raw in picked:
+        sf, sv, tf, tv = raw["source_field_id"], raw["source_value_id"], raw["target_field_id"], raw["target_value_id"]
+        results.append((sorted(rule_set.get_dependent_field_ids(target_only=True)),
+                        rule_set.get_source_rules(tf, tv),
+                        rule_set.get_source_rules(tf),
+                        rule_set.get_target_rules(sf, sv),
+                        [rule.key() for rule in rule_set.target_options(sf, sv, tgt_fid=tf)],
+                        rule_set.is_valid(sf, sv, tf, tv),
+                        rule_set.is_valid(sf, sv, tf, -1)))
+    return results
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    struct = synthetic.tracker_struct(list_fields=20, values_per_field=300)
+    raw_rules = synthetic.dependency_rules(struct, args.rules)
+    picked = queries(raw_rules, args.queries)
+
+    reference, reference_build = timed(LinearRuleSet, raw_rules)
+    indexed, indexed_build = timed(RuleSet, raw_rules)
+    expected, reference_time = timed(workload, reference, picked)
+    actual, indexed_time = timed(workload, indexed, picked)
+    assert actual == expected, "indexed RuleSet answers differ from the linear scans"
+
+    print(f"{args.rules} rules, {args.queries} rounds of 7 queries")
+    print(f"  linear : build {reference_build * 1000:8.1f} ms, queries {reference_time * 1000:9.1f} ms")
+    print(f"  indexed: build {indexed_build * 1000:8.1f} ms, queries {indexed_time * 1000:9.1f} ms "
+          f"({reference_time / indexed_time:.0f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+    Resident memory of a large in-memory artifact set, with the label/ID maps of the list fields
+    built per Field_msb instance (before) or shared per tracker field (after).
+
+    Run with tuleap_wrapper importable, no Tuleap server is needed:
+        python benchmarks/bench_value_maps.py --artifacts 50000
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        # Peak rather than current size, kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def run(mode, artifact_count, list_fields, values_per_field):
+    from tuleap_wrapper.Artifact import Artifact
+    from tuleap_wrapper.tracker_struct_manager import Tracker_struct_manager, TrackerStruct
+
+    if mode == "before":
+        # Every Field_msb builds its own maps, as before the maps were shared
+        TrackerStruct.get_value_maps = lambda self, identifier: None
+
+    struct = synthetic.tracker_struct(list_fields=list_fields, values_per_field=values_per_field)
+    payloads = [synthetic.artifact(artifact_id, struct) for artifact_id in range(artifact_count)]
+    Tracker_struct_manager.configure(cache_dir=tempfile.mkdtemp())
+    Tracker_struct_manager().set_ts(struct)
+
+    gc.collect()
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        artifacts = [Artifact.from_json(payload) for payload in payloads]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    rss_after = rss_bytes()
+    print(f"{mode:>6}: {len(artifacts)} artifacts parsed in {elapsed:.2f}s, "
+          f"RSS +{(rss_after - rss_before) / 2**20:.1f} MiB ({(rss_after - rss_before) / len(artifacts):.0f} bytes/artifact)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifacts", type=int, default=20000)
+    parser.add_argument("--list-fields", type=int, default=20)
+    parser.add_argument("--values", type=int, default=300, help="values per list field")
+    parser.add_argument("--mode", choices=("before", "after"), help="run one mode in this process")
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.artifacts, args.list_fields, args.values)
+        return
+    # One process per mode, so that the memory freed by a mode does not hide the cost of the other
+    for mode in ("before", "after"):
+        subprocess.run([sys.executable, __file__, "--mode", mode, "--artifacts", str(args.artifacts),
+                        "--list-fields", str(args.list_fields), "--values", str(args.values)], check=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+    Synthetic tracker structs and artifacts for the benchmarks, shaped like the Tuleap REST payloads.
+    Nothing here talks to a server.
+"""
+import random
+
+FIRST_LIST_FIELD_ID = 1000
+VALUE_ID_STRIDE = 10000
+
+def tracker_struct(tracker_id=1, list_fields=20, values_per_field=300, string_fields=5, rules=None):
+    """
+        Tracker with `list_fields` select boxes of `values_per_field` values each, and `string_fields` strings.
+        `rules` is the list of raw field dependency rules, none by default.
+    """
+    fields = [{"field_id": 1 + i, "name": f"string_{i}", "label": f"String {i}", "type": "string"}
+              for i in range(string_fields)]
+    for i in range(list_fields):
+        field_id = FIRST_LIST_FIELD_ID + i
+        fields.append({"field_id": field_id,
+                       "name": f"list_{i}",
+                       "label": f"List {i}",
+                       "type": "msb" if i % 2 else "sb",
+                       "values": [{"id": value_id(i, v), "label": f"Value {i}.{v}"} for v in range(values_per_field)]})
+    return {"id": tracker_id, "fields": fields, "workflow": {"rules": {"lists": rules or []}}}
+
+def mixed_tracker_struct(tracker_id=1, field_count=300, values_per_field=30, users=50):
+    """
+        Tracker of `field_count` fields cycling through the common field types: strings, texts, floats,
+        dates, static and user-bound lists, artifact links, and a computed field without decoder.
+    """
+    user_values = [{"id": 100 + u, "label": f"User {u}", "username": f"user{u}",
+                    "user_reference": {"id": 100 + u, "real_name": f"User {u}", "username": f"user{u}"}}
+                   for u in range(1, users + 1)]
+    kinds = ("string", "text", "float", "date", "sb", "msb", "user_sb", "user_msb", "art_link", "computed")
+    fields = []
+    for i in range(field_count):
+        kind = kinds[i % len(kinds)]
+        field = {"field_id": FIRST_LIST_FIELD_ID + i, "name": f"{kind}_{i}", "label": f"{kind} {i}",
+                 "type": kind.replace("user_", "")}
+        if kind in ("sb", "msb"):
+            field["values"] = [{"id": value_id(i, v), "label": f"Value {i}.{v}"} for v in range(values_per_field)]
+            field["bindings"] = {"type": "static"}
+        elif kind.startswith("user_"):
+            field["values"] = user_values
+            field["bindings"] = {"type": "users"}
+        fields.append(field)
+    return {"id": tracker_id, "fields": fields, "workflow": {"rules": {"lists": []}}}
+
+def value_id(field_index, value_index):
+    return (field_index + 1) * VALUE_ID_STRIDE + value_index
+
+def artifact(artifact_id, struct, seed=None):
+    """Artifact of the tracker with every field set, list fields to one or two random values."""
+    rng = random.Random(artifact_id if seed is None else seed)
+    values = []
+    for field in struct["fields"]:
+        field_id, field_type = field["field_id"], field["type"]
+        if field_type == "string":
+            values.append({"field_id": field_id, "type": "string", "value": f"Artifact {artifact_id}"})
+        elif field_type == "text":
+            values.append({"field_id": field_id, "type": "text", "value": f"<p>Artifact {artifact_id}</p>", "format": "html"})
+        elif field_type == "float":
+            values.append({"field_id": field_id, "type": "float", "value": rng.random() * 100})
+        elif field_type == "date":
+            values.append({"field_id": field_id, "type": "date", "value": f"2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T10:47:28+02:00"})
+        elif field_type == "art_link":
+            values.append({"field_id": field_id, "type": "art_link", "links": [{"id": artifact_id + 1, "tracker": {"id": struct["id"]}, "type": ""}],
+                           "reverse_links": [{"id": artifact_id - 1, "tracker": {"id": struct["id"]}, "type": "_is_child"}]})
+        elif field_type == "computed":
+            values.append({"field_id": field_id, "type": "computed", "value": rng.randint(0, 10), "manual_value": None, "is_autocomputed": True})
+        else:
+            picked = rng.sample(field["values"], 2 if field_type == "msb" else 1)
+            values.append({"field_id": field_id, "type": field_type,
+                           "values": [{key: item[key] for key in ("id", "label", "username") if key in item} for item in picked]})
+    return {"id": artifact_id, "tracker": {"id": struct["id"]}, "values": values}
+
+def dependency_rules(struct, count, seed=0):
+    """`count` distinct random rules between consecutive list fields of the tracker."""
+    rng = random.Random(seed)
+    list_fields = [field for field in struct["fields"] if "values" in field]
+    rules = set()
+    while len(rules) < count:
+        index = rng.randrange(len(list_fields) - 1)
+        source, target = list_fields[index], list_fields[index + 1]
+        rules.add((source["field_id"], rng.choice(source["values"])["id"],
+                   target["field_id"], rng.choice(target["values"])["id"]))
+    return [{"source_field_id": sf, "source_value_id": sv, "target_field_id": tf, "target_value_id": tv}
+            for sf, sv, tf, tv in sorted(rules)]
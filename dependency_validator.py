@@ -0,0 +1,122 @@
+try:
+    import numpy as np
+except ImportError:  # Optional, only needed by DependencyValidator
+    np = None
+
+from tuleap_wrapper.Fields import Field_msb
+
+class DependencyValidator:
+    """
+        Checks the field dependencies of many artifacts at once, straight from their raw JSON,
+        without building Artifact objects. Gives the same answer as Artifact.check_dependencies.
+
+        The rules of each (source field, target field) pair are compiled into a dense table of
+        allowed value pairs. Artifacts are processed in chunks: the bound values of a chunk are
+        encoded as 0/1 matrices, and a pair is checked for the whole chunk with two matrix
+        products. Requires numpy.
+
+            validator = DependencyValidator(Tracker_struct_manager().get_compiled(78))
+            invalid = validator.validate_pages(TuleapEndpoint().iter_artifact_pages(78))
+    """
+    DEFAULT_CHUNK_SIZE = 10000
+
+    class Pair_table:
+        """Allowed value pairs between a source field and a target field, restricted to the values having rules."""
+        def __init__(self, source_field_id, target_field_id, rules):
+            self.source_field_id = source_field_id
+            self.target_field_id = target_field_id
+            self.source_columns = {vid: index for index, vid in enumerate(sorted({rule.source_value_id for rule in rules}))}
+            self.target_columns = {vid: index for index, vid in enumerate(sorted({rule.target_value_id for rule in rules}))}
+            self.allowed = np.zeros((len(self.source_columns), len(self.target_columns)), dtype=np.float32)
+            for rule in rules:
+                self.allowed[self.source_columns[rule.source_value_id], self.target_columns[rule.target_value_id]] = 1.0
+
+    def __init__(self, tracker_struct):
+        """
+            Parameters:
+            tracker_struct (TrackerStruct): Compiled structure of the tracker of the artifacts.
+        """
+        if np is None:
+            raise ImportError("DependencyValidator requires numpy, install it with `pip install numpy`")
+
+        rules_by_pair = dict()
+        for rule in tracker_struct.ruleSet.get_all_rules():
+            rules_by_pair.setdefault((rule.source_field_id, rule.target_field_id), []).append(rule)
+        self.__tables = [DependencyValidator.Pair_table(source_fid, target_fid, rules)
+                         for (source_fid, target_fid), rules in rules_by_pair.items()]
+        self.__field_ids = tracker_struct.ruleSet.get_dependent_field_ids()
+
+    def validate(self, artifacts, chunk_size=DEFAULT_CHUNK_SIZE) -> list[tuple]:
+        """
+            Parameters:
+            artifacts (iterable): Artifact JSON, as returned by the REST API or read from a local mirror.
+            chunk_size (int): Artifacts encoded and checked together, bounds the memory used.
+
+            Returns:
+            list[tuple]: (artifact ID, field ID) of each target field breaking a dependency rule, in input order.
+        """
+        invalid = []
+        chunk = []
+        for artifact in artifacts:
+            chunk.append(artifact)
+            if len(chunk) >= chunk_size:
+                invalid += self.__validate_chunk(chunk)
+                chunk = []
+        if chunk:
+            invalid += self.__validate_chunk(chunk)
+        return invalid
+
+    def validate_pages(self, pages, chunk_size=DEFAULT_CHUNK_SIZE) -> list[tuple]:
+        """Same as validate, for pages of artifacts such as the ones of TuleapEndpoint.iter_artifact_pages."""
+        return self.validate((artifact for page in pages for artifact in page), chunk_size)
+
+    def __validate_chunk(self, artifacts):
+        bound_values = [self.__bound_values(artifact) for artifact in artifacts]
+        invalid_by_field = dict()
+        for table in self.__tables:
+            source = self.__encode(bound_values, table.source_field_id, table.source_columns)
+            target = self.__encode(bound_values, table.target_field_id, table.target_columns)
+            # A bound target value with rules must be allowed by one of the bound source values
+            target_allowed = (source @ table.allowed) > 0
+            invalid = ((target > 0) & ~target_allowed).any(axis=1)
+            # A bound source value with rules must allow one of the bound target values
+            source_satisfied = (target @ table.allowed.T) > 0
+            invalid |= ((source > 0) & ~source_satisfied).any(axis=1)
+
+            if table.target_field_id in invalid_by_field:
+                invalid_by_field[table.target_field_id] |= invalid
+            else:
+                invalid_by_field[table.target_field_id] = invalid
+
+        field_ids = sorted(invalid_by_field)
+        if not field_ids:
+            return []
+        invalid_matrix = np.stack([invalid_by_field[field_id] for field_id in field_ids], axis=1)
+        rows, columns = np.nonzero(invalid_matrix)
+        return [(artifacts[row]["id"], field_ids[column]) for row, column in zip(rows.tolist(), columns.tolist())]
+
+    def __bound_values(self, artifact) -> dict:
+        """Bound value IDs of the dependent fields, an empty list field being bound to EMPTY_FIELD_VID like in Field_msb."""
+        bound = dict()
+        for value in artifact["values"]:
+            if value["field_id"] in self.__field_ids:
+                if "bind_value_ids" in value:
+                    vids = value["bind_value_ids"]
+                else:
+                    vids = [item["id"] for item in value.get("values", ()) if item["id"] is not None]
+                bound[value["field_id"]] = vids or [Field_msb.EMPTY_FIELD_VID]
+        return bound
+
+    def __encode(self, bound_values, field_id, columns):
+        rows = []
+        cols = []
+        empty = [Field_msb.EMPTY_FIELD_VID]
+        for row, bound in enumerate(bound_values):
+            for vid in bound.get(field_id, empty):
+                col = columns.get(vid)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        matrix = np.zeros((len(bound_values), len(columns)), dtype=np.float32)
+        matrix[rows, cols] = 1.0
+        return matrix
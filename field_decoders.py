@@ -0,0 +1,116 @@
+from tuleap_wrapper.Fields import *
+
+# Field type -> factory(field_struct, tracker_struct) returning the decoder of the values of that field
+_decoder_factories = {}
+# Incremented on every registration, so that the plans compiled before are rebuilt
+_registry_version = 0
+
+def register_decoder(field_types, factory):
+    """
+        Registers how the values of a field type are decoded, replacing the built-in decoder if any.
+
+        Parameters:
+        field_types (str or tuple): Field type(s) as given in the tracker struct, e.g. "computed".
+        factory (callable): factory(field_struct, tracker_struct) is called once per tracker field when
+                            the plan is compiled, and returns decode(value) -> Field for the values of that field.
+
+        Example:
+            register_decoder("computed", lambda field_struct, tracker_struct:
+                             lambda value: Field_float(value["field_id"], field_struct["name"], value["value"]))
+    """
+    global _registry_version
+    if isinstance(field_types, str):
+        field_types = (field_types,)
+    for field_type in field_types:
+        _decoder_factories[field_type] = factory
+    _registry_version += 1
+
+class DecoderPlan:
+    """
+        Decoder of every field of a tracker, compiled once from its TrackerStruct: decoding a value
+        is one lookup by field ID and one call, the field type and list bindings being resolved here.
+        Values of field types without a decoder are kept as raw JSON.
+    """
+    def __init__(self, tracker_struct):
+        self.__version = _registry_version
+        self.__decoders = dict()
+        for field_id, field_struct in tracker_struct.fields_by_id.items():
+            factory = _decoder_factories.get(field_struct["type"])
+            decoder = factory(field_struct, tracker_struct) if factory else _raw_value
+            self.__decoders[field_id] = (field_struct["name"], decoder)
+
+    def is_current(self) -> bool:
+        """False once a decoder was registered after the plan was compiled."""
+        return self.__version == _registry_version
+
+    def decode(self, value):
+        """Returns the field name and the decoded value of the artifact JSON, None if the field is not in the tracker."""
+        entry = self.__decoders.get(value["field_id"])
+        if entry is None:
+            return None
+        name, decoder = entry
+        return name, decoder(value)
+
+def _raw_value(value):
+    return value
+
+def _string_decoder(field_struct, tracker_struct):
+    field_id, name = field_struct["field_id"], field_struct["name"]
+    return lambda value: Field_string(field_id, name, value['value'])
+
+def _text_decoder(field_struct, tracker_struct):
+    field_id, name = field_struct["field_id"], field_struct["name"]
+    return lambda value: Field_text(field_id, name, value['value'], t_format=value['format'])
+
+def _art_links_decoder(field_struct, tracker_struct):
+    field_id, name = field_struct["field_id"], field_struct["name"]
+
+    def decode(value):
+        links = [Field_artLinks.ArtLink(id_artifact=link['id'],
+                                        id_tracker=link['tracker']['id'],
+                                        direction=Field_artLinks.ArtLink.Direction.FORWARD,
+                                        relation=link['type'])
+                 for link in value['links']]
+        links += [Field_artLinks.ArtLink(id_artifact=link['id'],
+                                         id_tracker=link['tracker']['id'],
+                                         direction=Field_artLinks.ArtLink.Direction.REVERSE,
+                                         relation=link['type'])
+                  for link in value['reverse_links']]
+        return Field_artLinks(field_id, name, links)
+    return decode
+
+def _date_decoder(field_struct, tracker_struct):
+    field_id, name = field_struct["field_id"], field_struct["name"]
+    return lambda value: Field_date(field_id, name, value['value']) if value['value'] else Field_date(field_id, name)
+
+def _list_decoder(field_struct, tracker_struct):
+    field_id, name, field_type = field_struct["field_id"], field_struct["name"], field_struct["type"]
+    value_maps = tracker_struct.get_value_maps(field_id)
+    multiple = field_type in (Field_type.MSB, Field_type.CB)
+    if is_user_list(field_struct):
+        field_class = Field_users if multiple else Field_user
+        return lambda value: field_class(field_id, name, field_struct, value['values'], value_maps=value_maps)
+    field_class = Field_msb if multiple else Field_sb
+    return lambda value: field_class(field_id, name, field_struct, value['values'], fieldType=field_type, value_maps=value_maps)
+
+def _submitter_decoder(field_struct, tracker_struct):
+    field_id, name, field_type = field_struct["field_id"], field_struct["name"], field_struct["type"]
+    value_maps = tracker_struct.get_value_maps(field_id)
+    return lambda value: Field_user(field_id, name, field_struct, [value['value']], fieldType=field_type, value_maps=value_maps)
+
+def _files_decoder(field_struct, tracker_struct):
+    field_id, name = field_struct["field_id"], field_struct["name"]
+    return lambda value: Field_files(field_id, name, value["file_descriptions"])
+
+def _float_decoder(field_struct, tracker_struct):
+    field_id, name = field_struct["field_id"], field_struct["name"]
+    return lambda value: Field_float(field_id, name, value["value"])
+
+register_decoder(Field_type.STRING, _string_decoder)
+register_decoder(Field_type.TEXT, _text_decoder)
+register_decoder(Field_type.ARTLINKS, _art_links_decoder)
+register_decoder((Field_type.DATE, Field_type.SUBON, Field_type.LUD), _date_decoder)
+register_decoder((Field_type.MSB, Field_type.CB, Field_type.SB, Field_type.RB), _list_decoder)
+register_decoder((Field_type.SUBBY, Field_type.LUBY), _submitter_decoder)
+register_decoder(Field_type.FILES, _files_decoder)
+register_decoder(Field_type.FLOAT, _float_decoder)
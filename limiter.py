@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+THROTTLING_STATUS_CODES = (429, 503)
+
+def parse_retry_after(value) -> float:
+    """Seconds to wait from a Retry-After header, given in seconds or as an HTTP date. None if absent or invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, base=0.5, cap=30.0, retry_after=None) -> float:
+    """Full-jitter exponential backoff, never shorter than what the server asked for."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+class AdaptiveLimiter:
+    """
+        Client-side limit of the requests in flight, shared by all the threads, adjusted AIMD-style.
+
+        Every request that completes without throttling raises the limit by about one per round of
+        `limit` requests. A throttling response (429/503) halves it, and a smoothed latency above
+        `latency_tolerance` times the best observed latency or a network failure shrinks it by
+        `latency_backoff`. A round only reacts once: the requests sent before the last decrease
+        cannot decrease the limit again.
+        A Retry-After pauses every new request until the server is ready again.
+
+        Each `acquire` must be matched by exactly one `release` of its ticket.
+    """
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=64, throttle_backoff=0.5, latency_backoff=0.9, latency_tolerance=2.0):
+        self.__condition = threading.Condition()
+        self.__limit = float(initial_limit)
+        self.__min_limit = min_limit
+        self.__max_limit = max_limit
+        self.__throttle_backoff = throttle_backoff
+        self.__latency_backoff = latency_backoff
+        self.__latency_tolerance = latency_tolerance
+        self.__in_flight = 0
+        self.__paused_until = 0.0
+        self.__base_latency = None
+        self.__smoothed_latency = None
+        self.__since_decrease = 0
+        self.__sent = 0
+        self.__decrease_ticket = 0
+        self.throttled = 0
+        self.errors = 0
+        self.retries = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self.__limit)
+
+    def acquire(self) -> int:
+        """Blocks until a request may be sent, returns the ticket to release it with."""
+        with self.__condition:
+            while True:
+                ticket, wait = self.__try_acquire()
+                if ticket is not None:
+                    return ticket
+                self.__condition.wait(wait)
+
+    def try_acquire(self):
+        """
+            Non-blocking `acquire`, for asyncio callers that must not block the event loop.
+
+            Returns:
+            tuple: (ticket, None) if the request may be sent. Otherwise (None, seconds to wait before
+                   trying again), the seconds being None when only a release can free a slot.
+        """
+        with self.__condition:
+            return self.__try_acquire()
+
+    def __try_acquire(self):
+        pause = self.__paused_until - time.monotonic()
+        if pause > 0:
+            return None, pause
+        if self.__in_flight < int(self.__limit):
+            self.__in_flight += 1
+            self.__sent += 1
+            return self.__sent, None
+        return None, None
+
+    def release(self, ticket, latency, throttled=False, retry_after=None, failed=False):
+        """
+            Reports the outcome of a request sent after `acquire`.
+
+            Parameters:
+            ticket (int): Returned by the matching `acquire`.
+            latency (float): Duration of the request in seconds.
+            throttled (bool): The server answered 429/503.
+            retry_after (float): Seconds asked by the server before sending again.
+            failed (bool): No response, the request failed on the network or was interrupted.
+        """
+        with self.__condition:
+            self.__in_flight -= 1
+            # Only the requests sent since the last decrease reflect the current limit
+            new_round = ticket > self.__decrease_ticket
+            if new_round:
+                self.__since_decrease += 1
+            if throttled:
+                self.throttled += 1
+                if new_round:
+                    self.__decrease(self.__throttle_backoff)
+                if retry_after is not None:
+                    self.__paused_until = max(self.__paused_until, time.monotonic() + retry_after)
+            elif failed:
+                self.errors += 1
+                if new_round:
+                    self.__decrease(self.__latency_backoff)
+            else:
+                self.__smoothed_latency = latency if self.__smoothed_latency is None else self.__smoothed_latency * 0.8 + latency * 0.2
+                # Lowest latency seen, slowly forgotten so that a permanently slower server is accepted
+                if self.__base_latency is None or latency < self.__base_latency:
+                    self.__base_latency = latency
+                else:
+                    self.__base_latency += (latency - self.__base_latency) * 0.05
+
+                # At most one latency decrease per round of `limit` requests, a single slow response is not congestion
+                if (self.__smoothed_latency > self.__base_latency * self.__latency_tolerance and
+                    self.__since_decrease >= self.__limit):
+                    self.__decrease(self.__latency_backoff)
+                else:
+                    self.__limit = min(self.__max_limit, self.__limit + 1 / self.__limit)
+            self.__condition.notify_all()
+
+    def __decrease(self, ratio):
+        self.__limit = max(self.__min_limit, self.__limit * ratio)
+        self.__since_decrease = 0
+        self.__decrease_ticket = self.__sent
+
+    def record_retry(self):
+        with self.__condition:
+            self.retries += 1
+
+    def stats(self) -> dict:
+        with self.__condition:
+            return {"limit": int(self.__limit), "in_flight": self.__in_flight, "throttled": self.throttled, "errors": self.errors, "retries": self.retries}
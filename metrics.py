@@ -0,0 +1,160 @@
+import threading
+from abc import ABC, abstractmethod
+from tuleap_wrapper.utils import atomic_write
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class OperationEvent:
+    """
+        One logical operation, as reported to the metrics sinks.
+
+        Parameters:
+        operation (str): Name of the operation, e.g. "get_artifact" or "parse_artifact".
+        latency (float): Duration in seconds, retries and backoff included.
+        requests (int): HTTP requests sent, 0 for an operation served from a cache or done on the client.
+        error (bool): The operation failed.
+        status_code (int): Status of the last response, None if there was none.
+        bytes_in (int): Response body bytes received.
+        bytes_out (int): Request body bytes sent.
+        retries (int): Requests sent again after a throttling or network failure.
+        cache_hit (bool): The result came from a cache, possibly after a 304 revalidation.
+    """
+    def __init__(self, operation, latency, requests=0, error=False, status_code=None,
+                 bytes_in=0, bytes_out=0, retries=0, cache_hit=False):
+        self.operation = operation
+        self.latency = latency
+        self.requests = requests
+        self.error = error
+        self.status_code = status_code
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.retries = retries
+        self.cache_hit = cache_hit
+
+class MetricsSink(ABC):
+    """Receives every OperationEvent recorded by the endpoint."""
+    @abstractmethod
+    def record(self, event:OperationEvent):
+        pass
+
+class CallbackSink(MetricsSink):
+    """Forwards the events to a callable, to feed another exporter."""
+    def __init__(self, callback):
+        self.__callback = callback
+
+    def record(self, event:OperationEvent):
+        self.__callback(event)
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def cumulative_counts(self):
+        result = []
+        total = 0
+        for count in self.bucket_counts:
+            total += count
+            result.append(total)
+        return result
+
+class OperationMetrics:
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.calls = 0
+        self.requests = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.latency = Histogram(buckets)
+
+    def as_dict(self) -> dict:
+        return {"calls": self.calls,
+                "requests": self.requests,
+                "errors": self.errors,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "retries": self.retries,
+                "cache_hits": self.cache_hits,
+                "latency_count": self.latency.count,
+                "latency_sum": self.latency.sum}
+
+class MetricsRegistry(MetricsSink):
+    """In-process aggregation of the events per operation, exportable in the Prometheus text format."""
+    PREFIX = "tuleap"
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.__buckets = buckets
+        self.__operations = {}
+        self.__lock = threading.Lock()
+
+    def record(self, event:OperationEvent):
+        with self.__lock:
+            metrics = self.__operations.get(event.operation)
+            if metrics is None:
+                metrics = self.__operations[event.operation] = OperationMetrics(self.__buckets)
+            metrics.calls += 1
+            metrics.requests += event.requests
+            metrics.errors += int(event.error)
+            metrics.bytes_in += event.bytes_in
+            metrics.bytes_out += event.bytes_out
+            metrics.retries += event.retries
+            metrics.cache_hits += int(event.cache_hit)
+            metrics.latency.observe(event.latency)
+
+    def get(self, operation) -> OperationMetrics:
+        return self.__operations.get(operation)
+
+    def snapshot(self) -> dict:
+        with self.__lock:
+            return {operation: metrics.as_dict() for operation, metrics in self.__operations.items()}
+
+    def reset(self):
+        with self.__lock:
+            self.__operations.clear()
+
+    def prometheus_text(self) -> str:
+        """Renders the registry in the Prometheus text exposition format."""
+        counters = (("calls_total", "calls", "Logical operations."),
+                    ("requests_total", "requests", "HTTP requests sent to Tuleap."),
+                    ("errors_total", "errors", "Failed operations."),
+                    ("bytes_in_total", "bytes_in", "Response body bytes received."),
+                    ("bytes_out_total", "bytes_out", "Request body bytes sent."),
+                    ("retries_total", "retries", "Requests retried after a throttling or network failure."),
+                    ("cache_hits_total", "cache_hits", "Operations served from a cache."))
+        lines = []
+        with self.__lock:
+            operations = sorted(self.__operations.items())
+            for suffix, attribute, help_text in counters:
+                name = f"{self.PREFIX}_{suffix}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for operation, metrics in operations:
+                    lines.append(f'{name}{{operation="{operation}"}} {getattr(metrics, attribute)}')
+
+            name = f"{self.PREFIX}_operation_duration_seconds"
+            lines.append(f"# HELP {name} Duration of the operations.")
+            lines.append(f"# TYPE {name} histogram")
+            for operation, metrics in operations:
+                histogram = metrics.latency
+                for upper_bound, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                    lines.append(f'{name}_bucket{{operation="{operation}",le="{upper_bound}"}} {count}')
+                lines.append(f'{name}_bucket{{operation="{operation}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{operation="{operation}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{operation="{operation}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Dumps the registry to a file atomically, e.g. for the node_exporter textfile collector."""
+        atomic_write(path, self.prometheus_text().encode("utf-8"))
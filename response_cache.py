@@ -0,0 +1,125 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from tuleap_wrapper.utils import atomic_write
+
+class CachedResponse:
+    """Body of a GET response with the validators to revalidate it with a conditional request."""
+    def __init__(self, body:bytes, etag=None, last_modified=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def from_response(cls, response):
+        """Returns None if the response has no validator, it could not be revalidated."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            return None
+        return cls(response.content, etag, last_modified)
+
+    def to_json(self) -> dict:
+        return {"body": base64.b64encode(self.body).decode("ascii"), "etag": self.etag, "last_modified": self.last_modified}
+
+    @classmethod
+    def from_json(cls, json_data):
+        return cls(base64.b64decode(json_data["body"], validate=True), json_data.get("etag"), json_data.get("last_modified"))
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ResponseCache(ABC):
+    """Storage interface of the conditional-request cache used by TuleapEndpoint."""
+    @abstractmethod
+    def get(self, key) -> CachedResponse:
+        """Returns None on a miss."""
+
+    @abstractmethod
+    def set(self, key, entry:CachedResponse):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+class MemoryResponseCache(ResponseCache):
+    """In-process storage, the least recently used entries are evicted beyond `max_entries`."""
+    def __init__(self, max_entries=1024):
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key) -> CachedResponse:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry:CachedResponse):
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+class DiskResponseCache(ResponseCache):
+    """
+        On-disk storage, one file per entry, kept across processes and runs. Entries are JSON with
+        the body base64-encoded, never unpickled, so a directory writable by others cannot run code.
+    """
+    FILE_SUFFIX = ".response"
+
+    def __init__(self, directory):
+        self.__directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def __path(self, key):
+        return os.path.join(self.__directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + self.FILE_SUFFIX)
+
+    def get(self, key) -> CachedResponse:
+        try:
+            with open(self.__path(key), "rb") as file:
+                return CachedResponse.from_json(json.load(file))
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, or unreadable such as an entry of an older version: a cache miss
+            return None
+
+    def set(self, key, entry:CachedResponse):
+        atomic_write(self.__path(key), json.dumps(entry.to_json(), separators=(",", ":")).encode("utf-8"))
+
+    def delete(self, key):
+        try:
+            os.unlink(self.__path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for file_name in os.listdir(self.__directory):
+            if file_name.endswith(self.FILE_SUFFIX):
+                os.unlink(os.path.join(self.__directory, file_name))
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+class SingleFlight:
+    """
+        Coalesces identical calls made by concurrent threads: while a call for a key is running,
+        other callers with the same key wait for it and get its result (or its exception)
+        instead of running their own.
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__in_flight = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    def do(self, key, function, *args, **kwargs):
+        with self.__lock:
+            future = self.__in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.__in_flight[key] = future
+                self.calls += 1
+            else:
+                self.deduplicated += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.__lock:
+                del self.__in_flight[key]
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {"calls": self.calls, "deduplicated": self.deduplicated, "in_flight": len(self.__in_flight)}
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of SingleFlight, for coroutines running on one event loop."""
+    def __init__(self):
+        self.__in_flight = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def do(self, key, coroutine_function, *args, **kwargs):
+        task = self.__in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coroutine_function(*args, **kwargs))
+            self.__in_flight[key] = task
+            task.add_done_callback(lambda _: self.__in_flight.pop(key, None))
+            self.calls += 1
+        else:
+            self.deduplicated += 1
+        # A cancelled caller must not cancel the request the others are waiting for
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "deduplicated": self.deduplicated, "in_flight": len(self.__in_flight)}
@@ -0,0 +1,24 @@
+import httpx
+import pytest
+
+from tuleap_wrapper.limiter import AdaptiveLimiter
+from tuleap_wrapper.tuleap_endpoint import TuleapEndpoint
+
+BASE_URL = "https://tuleap.test"
+
+@pytest.fixture
+def mock_endpoint(monkeypatch):
+    """
+        Configures TuleapEndpoint against an httpx.MockTransport, without the Tuleap.RestClient login.
+        Call it with a handler taking an httpx.Request and returning an httpx.Response.
+    """
+    def configure(handler) -> TuleapEndpoint:
+        session = httpx.Client(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(TuleapEndpoint, "base_url", BASE_URL)
+        monkeypatch.setattr(TuleapEndpoint, "api_url", BASE_URL + "/api/")
+        monkeypatch.setattr(TuleapEndpoint, "auth_token", "key")
+        monkeypatch.setattr(TuleapEndpoint, "session", session)
+        monkeypatch.setattr(TuleapEndpoint, "response_cache", None)
+        monkeypatch.setattr(TuleapEndpoint, "limiter", AdaptiveLimiter(max_limit=8))
+        return TuleapEndpoint()
+    return configure
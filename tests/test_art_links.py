@@ -0,0 +1,19 @@
+import pytest
+
+from tuleap_wrapper.Fields import Field_artLinks
+
+ArtLink = Field_artLinks.ArtLink
+
+def test_art_links_are_read_only():
+    field = Field_artLinks(9, "links", [ArtLink(5, 1)])
+    with pytest.raises(AttributeError):
+        field.artLinks.append(ArtLink(6, 1))
+    field.set_links(field.artLinks + (ArtLink(6, 1),))
+    assert [link.id_artifact for link in field.artLinks] == [5, 6]
+
+def test_indexed_links_stay_read_only():
+    field = Field_artLinks(9, "links", [ArtLink(5, 1)])
+    field.add_link(ArtLink(6, 2))
+    with pytest.raises(AttributeError):
+        field.artLinks.remove(field.artLinks[0])
+    assert field.from_tracker_id(2) == [ArtLink(6, 2)]
@@ -0,0 +1,62 @@
+import httpx
+import pytest
+
+from tuleap_wrapper import Documents
+from tuleap_wrapper.Documents import DocumentInterface, UploadError
+from tuleap_wrapper.tuleap_endpoint import TuleapEndpoint
+
+from .conftest import BASE_URL
+
+def tus_handler(received, accept=lambda chunk: chunk, offset_header=True):
+    """Mock Tuleap upload: creates the document, then keeps the TUS offset of the bytes accepted."""
+    def handler(request:httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return httpx.Response(201, json={"id": 42, "upload_href": "/uploads/1", "file_properties": {"upload_href": "/uploads/1"}})
+        if request.method == "PATCH":
+            assert int(request.headers["Upload-Offset"]) == len(received)
+            received.extend(accept(request.content))
+        headers = {"Upload-Offset": str(len(received))} if offset_header else {}
+        return httpx.Response(204 if request.method == "PATCH" else 200, headers=headers)
+    return handler
+
+@pytest.fixture
+def upload_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(Documents, "CHUNK_SIZE", 1000)
+    path = tmp_path / "file.bin"
+    path.write_bytes(bytes(range(256)) * 18)
+    return path
+
+def test_session_looked_up_on_each_request(mock_endpoint, upload_file):
+    documents = DocumentInterface(BASE_URL, "key")
+    first = bytearray()
+    mock_endpoint(tus_handler(first))
+    assert documents.upload_file(str(upload_file), 7) == 42
+    assert first == upload_file.read_bytes()
+
+    # A new configure closes the old client, the interface follows the new one
+    TuleapEndpoint.session.close()
+    second = bytearray()
+    mock_endpoint(tus_handler(second))
+    documents.update_file(str(upload_file), 42)
+    assert second == upload_file.read_bytes()
+
+def test_upload_error_on_failed_request(mock_endpoint, upload_file):
+    mock_endpoint(lambda request: httpx.Response(403, text="forbidden"))
+    with pytest.raises(UploadError, match="403"):
+        DocumentInterface(BASE_URL, "key").upload_file(str(upload_file), 7)
+
+def test_upload_resumes_after_a_partial_chunk(mock_endpoint, upload_file):
+    received = bytearray()
+    mock_endpoint(tus_handler(received, accept=lambda chunk: chunk[:300]))
+    DocumentInterface(BASE_URL, "key").upload_file(str(upload_file), 7)
+    assert received == upload_file.read_bytes()
+
+def test_upload_error_when_stuck(mock_endpoint, upload_file):
+    mock_endpoint(tus_handler(bytearray(), accept=lambda chunk: b""))
+    with pytest.raises(UploadError, match="stuck"):
+        DocumentInterface(BASE_URL, "key").upload_file(str(upload_file), 7)
+
+def test_upload_error_without_offset_header(mock_endpoint, upload_file):
+    mock_endpoint(tus_handler(bytearray(), offset_header=False))
+    with pytest.raises(UploadError, match="Upload-Offset"):
+        DocumentInterface(BASE_URL, "key").upload_file(str(upload_file), 7)
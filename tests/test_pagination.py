@@ -0,0 +1,49 @@
+import httpx
+import pytest
+
+ARTIFACT_COUNT = 30
+# Artifacts the user cannot read: left out of their page, still counted in X-PAGINATION-SIZE
+HIDDEN_IDS = {5, 14}
+READABLE_IDS = [artifact_id for artifact_id in range(1, ARTIFACT_COUNT + 1) if artifact_id not in HIDDEN_IDS]
+
+def artifact_list_handler(hidden_ids=HIDDEN_IDS):
+    def handler(request:httpx.Request) -> httpx.Response:
+        limit = int(request.url.params["limit"])
+        offset = int(request.url.params["offset"])
+        page = [{"id": artifact_id} for artifact_id in range(offset + 1, min(offset + limit, ARTIFACT_COUNT) + 1)
+                if artifact_id not in hidden_ids]
+        return httpx.Response(200, json=page, headers={"X-PAGINATION-SIZE": str(ARTIFACT_COUNT)})
+    return handler
+
+@pytest.mark.parametrize("concurrency", [None, 4])
+def test_artifact_id_list_with_short_pages(mock_endpoint, concurrency):
+    endpoint = mock_endpoint(artifact_list_handler())
+    assert endpoint.get_artifact_id_list(7, limit=10, concurrency=concurrency) == READABLE_IDS
+
+@pytest.mark.parametrize("concurrency", [None, 4])
+def test_artifact_id_list_continues_after_an_empty_page(mock_endpoint, concurrency):
+    hidden_ids = set(range(11, 21))
+    endpoint = mock_endpoint(artifact_list_handler(hidden_ids))
+    expected = [artifact_id for artifact_id in range(1, ARTIFACT_COUNT + 1) if artifact_id not in hidden_ids]
+    assert endpoint.get_artifact_id_list(7, limit=10, concurrency=concurrency) == expected
+
+def test_artifact_id_list_limit_capped_to_the_server_maximum(mock_endpoint):
+    limits = []
+    def handler(request):
+        limits.append(int(request.url.params["limit"]))
+        return artifact_list_handler()(request)
+    endpoint = mock_endpoint(handler)
+    assert endpoint.get_artifact_id_list(7, limit=500) == READABLE_IDS
+    assert limits == [endpoint.ARTIFACTS_QUERY_LIMIT_MAX]
+
+def test_artifact_pages_with_short_pages(mock_endpoint):
+    endpoint = mock_endpoint(artifact_list_handler())
+    pages = list(endpoint.iter_artifact_pages(7, page_size=10))
+    assert [artifact["id"] for page in pages for artifact in page] == READABLE_IDS
+    assert all(pages)
+
+def test_artifact_pages_continue_after_an_empty_page(mock_endpoint):
+    hidden_ids = set(range(11, 21))
+    endpoint = mock_endpoint(artifact_list_handler(hidden_ids))
+    pages = list(endpoint.iter_artifact_pages(7, page_size=10))
+    assert [artifact["id"] for page in pages for artifact in page] == list(range(1, 11)) + list(range(21, 31))
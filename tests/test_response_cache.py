@@ -0,0 +1,16 @@
+import pickle
+
+from tuleap_wrapper.response_cache import CachedResponse, DiskResponseCache
+
+def test_disk_entries_round_trip(tmp_path):
+    cache = DiskResponseCache(str(tmp_path))
+    cache.set("artifacts/1?", CachedResponse(b'{"id": 1}\xff', etag='"abc"'))
+    entry = DiskResponseCache(str(tmp_path)).get("artifacts/1?")
+    assert (entry.body, entry.etag, entry.last_modified) == (b'{"id": 1}\xff', '"abc"', None)
+
+def test_disk_entries_are_never_unpickled(tmp_path):
+    cache = DiskResponseCache(str(tmp_path))
+    cache.set("artifacts/1?", CachedResponse(b"{}", etag='"abc"'))
+    path, = tmp_path.iterdir()
+    path.write_bytes(pickle.dumps(CachedResponse(b"{}", etag='"abc"')))
+    assert cache.get("artifacts/1?") is None
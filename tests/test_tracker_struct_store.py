@@ -0,0 +1,32 @@
+import json
+import pickle
+
+import pytest
+
+from tuleap_wrapper.tracker_struct_manager import Tracker_struct_manager
+
+def tracker_struct(tracker_id):
+    return {"id": tracker_id,
+            "fields": [{"field_id": 1, "name": "status", "type": "sb", "label": "Status",
+                        "values": [{"id": 200, "label": "Open"}]}],
+            "workflow": {"rules": {"lists": []}}}
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(Tracker_struct_manager, "ttl", None)
+    monkeypatch.setattr(Tracker_struct_manager, "cache_dir", str(tmp_path))
+    return Tracker_struct_manager()
+
+def test_stored_as_compact_json(store, tmp_path):
+    store.set_ts(tracker_struct(9001))
+    content = (tmp_path / "9001_ts.json").read_text(encoding="utf-8")
+    assert json.loads(content) == tracker_struct(9001)
+    assert content == json.dumps(tracker_struct(9001), separators=(",", ":"))
+
+def test_loaded_from_disk(store, tmp_path):
+    (tmp_path / "9002_ts.json").write_text(json.dumps(tracker_struct(9002), indent=4), encoding="utf-8")
+    assert store.get_ts(9002) == tracker_struct(9002)
+
+def test_pickle_files_are_never_loaded(store, tmp_path):
+    (tmp_path / "9003_ts.pickle").write_bytes(pickle.dumps(tracker_struct(9003)))
+    assert not store.has_ts(9003)
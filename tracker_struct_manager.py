@@ -1,46 +1,233 @@
+import hashlib
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import tuleap_wrapper.tuleap_endpoint as tue
+from tuleap_wrapper.Fields import Field_msb
+from tuleap_wrapper.field_decoders import DecoderPlan
 from tuleap_wrapper.Rules import *
+from tuleap_wrapper.utils import atomic_write, FileLock
 
+# Plain JSON, never unpickled: the cache directory may be shared with other users and processes
 ts_suffix = "_ts.json"
+lock_suffix = "_ts.lock"
 ts_folder = "tracker_structs/"
 
 class Tracker_struct_manager:
     __tracker_structs = {}
-    __tuleap_endpoint = tue.TuleapEndpoint()
+    # Compiled TrackerStruct per tracker ID, shared by the whole process
+    __compiled_structs = {}
+    # When each tracker struct was last fetched or confirmed unchanged, and the hash of its content
+    __loaded_at = {}
+    __hashes = {}
+    __revalidating = set()
+    __unknown_field_refreshed_at = {}
+    __lock = threading.Lock()
+    __tuleap_endpoint = tue.LazyEndpoint()
+
+    # Seconds a tracker struct is trusted before being revalidated, None to trust it forever
+    ttl = None
+    cache_dir = ts_folder
+    UNKNOWN_FIELD_REFRESH_COOLDOWN = 60.0
+
     def __init__(self):
         pass
 
+    @classmethod
+    def configure(cls, ttl=None, cache_dir=ts_folder):
+        """
+            Parameters:
+            ttl (float): Seconds after which a tracker struct is revalidated in a background thread,
+                         the cached copy being served meanwhile. None trusts cached structs forever.
+            cache_dir (str): Directory of the on-disk tracker structs, can be shared by several processes.
+        """
+        cls.ttl = ttl
+        cls.cache_dir = cache_dir
+
     def set_ts(self, tracker_struct):
-        ts_id = tracker_struct["id"]
-        Tracker_struct_manager.__tracker_structs[ts_id] = tracker_struct
-        if not os.path.exists(ts_folder):
-            os.makedirs(ts_folder)
-            print(f"TSM: Created folder {ts_folder}")
-        with open(ts_folder + str(ts_id) + ts_suffix, 'w', encoding='utf-8') as file:
-            json.dump(tracker_struct, file, indent=4)
-        print("TSM: Saved tracker struct to disk " + str(ts_id))
+        self.__remember(tracker_struct)
+        with FileLock(self.__path(tracker_struct["id"], lock_suffix)):
+            self.__write_ts(tracker_struct)
+
+    def has_ts(self, tracker_struct_id):
+        """Checks if the tracker struct is available without an API call, in memory or on disk."""
+        return (tracker_struct_id in Tracker_struct_manager.__tracker_structs or
+                os.path.isfile(self.__path(tracker_struct_id, ts_suffix)))
+
+    async def aget_ts(self, tracker_struct_id, async_endpoint):
+        """Same as get_ts, but a missing tracker struct is fetched with the given AsyncTuleapEndpoint."""
+        if not self.has_ts(tracker_struct_id):
+            newTs = await async_endpoint.get_tracker_struct_by_id(tracker_struct_id)
+            print("TSM: Fetched tracker struct with async api: " + str(tracker_struct_id))
+            self.set_ts(newTs)
+
+        return self.get_ts(tracker_struct_id)
 
     def get_ts(self, tracker_struct_id):
         if tracker_struct_id not in Tracker_struct_manager.__tracker_structs:
-            ts_file_path = ts_folder + str(tracker_struct_id) + ts_suffix
-            if (os.path.isfile(ts_file_path)):
-                with open(ts_file_path, 'r', encoding='utf-8') as file:
-                    Tracker_struct_manager.__tracker_structs[tracker_struct_id] = json.load(file)
-                    print("TSM: Loaded tracker struct from disk " + str(tracker_struct_id))
-            else:
-                newTs = Tracker_struct_manager.__tuleap_endpoint.get_tracker_struct_by_id(tracker_struct_id)
-                print("TSM: Fetched tracker struct with api: " + str(tracker_struct_id))
-                self.set_ts(newTs)
+            # Processes starting together wait for the first one to fetch the struct instead of all fetching it
+            with FileLock(self.__path(tracker_struct_id, lock_suffix)):
+                if not self.__load_ts(tracker_struct_id):
+                    newTs = Tracker_struct_manager.__tuleap_endpoint.get_tracker_struct_by_id(tracker_struct_id)
+                    print("TSM: Fetched tracker struct with api: " + str(tracker_struct_id))
+                    self.__remember(newTs)
+                    self.__write_ts(newTs)
 
+        self.__revalidate_if_stale(tracker_struct_id)
         return Tracker_struct_manager.__tracker_structs[tracker_struct_id]
 
+    def get_compiled(self, tracker_struct_id) -> "TrackerStruct":
+        """
+            Returns the TrackerStruct of the tracker, built once and shared by every artifact of the
+            process until the tracker struct is set again.
+        """
+        compiled = Tracker_struct_manager.__compiled_structs.get(tracker_struct_id)
+        if compiled is None:
+            compiled = TrackerStruct(self.get_ts(tracker_struct_id))
+            Tracker_struct_manager.__compiled_structs[tracker_struct_id] = compiled
+        else:
+            self.__revalidate_if_stale(tracker_struct_id)
+        return compiled
+
+    def prefetch(self, tracker_struct_ids, workers=tue.TuleapEndpoint.DEFAULT_POOL_SIZE):
+        """
+            Warm-up before a workload: loads and compiles the tracker structs with `workers` parallel
+            threads, the ones missing from the disk cache are fetched and saved.
+            A tracker struct that fails is reported and left to be fetched on first use.
+            Returns the TrackerStruct of each tracker that could be loaded.
+        """
+        tracker_struct_ids = list(dict.fromkeys(tracker_struct_ids))
+        compiled = {}
+
+        def load(tracker_struct_id):
+            try:
+                return self.get_compiled(tracker_struct_id)
+            except Exception as e:
+                print(f"TSM: Prefetch of tracker struct {tracker_struct_id} failed: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for tracker_struct_id, tracker_struct in zip(tracker_struct_ids, executor.map(load, tracker_struct_ids)):
+                if tracker_struct is not None:
+                    compiled[tracker_struct_id] = tracker_struct
+        print(f"TSM: Prefetched {len(compiled)}/{len(tracker_struct_ids)} tracker structs")
+        return compiled
+
+    def prefetch_project(self, project_id, workers=tue.TuleapEndpoint.DEFAULT_POOL_SIZE):
+        """Same as prefetch, for all the trackers of a project."""
+        tracker_struct_ids = Tracker_struct_manager.__tuleap_endpoint.get_project_tracker_ids(project_id)
+        return self.prefetch(tracker_struct_ids, workers)
+
+    def refresh(self, tracker_struct_id):
+        """Fetches the tracker struct again and replaces the cached one if it changed, returns True if it changed."""
+        newTs = Tracker_struct_manager.__tuleap_endpoint.get_tracker_struct_by_id(tracker_struct_id)
+        current = Tracker_struct_manager.__tracker_structs.get(tracker_struct_id)
+        current_hash = Tracker_struct_manager.__hashes.get(tracker_struct_id)
+        if current is not None and current_hash is None:
+            current_hash = self.__hash(current)
+
+        if current_hash == self.__hash(newTs):
+            Tracker_struct_manager.__hashes[tracker_struct_id] = current_hash
+            Tracker_struct_manager.__loaded_at[tracker_struct_id] = time.time()
+            ts_file_path = self.__path(tracker_struct_id, ts_suffix)
+            if os.path.isfile(ts_file_path):
+                os.utime(ts_file_path)
+            print("TSM: Tracker struct unchanged " + str(tracker_struct_id))
+            return False
+
+        print("TSM: Tracker struct changed, refreshed " + str(tracker_struct_id))
+        self.set_ts(newTs)
+        return True
+
+    def refresh_on_unknown_field(self, tracker_struct_id):
+        """
+            Refresh requested because an artifact holds a field the cached struct does not know.
+            Done at most once per UNKNOWN_FIELD_REFRESH_COOLDOWN per tracker, in case the field is
+            really missing from the struct.
+        """
+        now = time.time()
+        with Tracker_struct_manager.__lock:
+            if now - Tracker_struct_manager.__unknown_field_refreshed_at.get(tracker_struct_id, 0) < Tracker_struct_manager.UNKNOWN_FIELD_REFRESH_COOLDOWN:
+                return False
+            Tracker_struct_manager.__unknown_field_refreshed_at[tracker_struct_id] = now
+        return self.refresh(tracker_struct_id)
+
+    def __revalidate_if_stale(self, tracker_struct_id):
+        if Tracker_struct_manager.ttl is None:
+            return
+        loaded_at = Tracker_struct_manager.__loaded_at.get(tracker_struct_id, 0)
+        if time.time() - loaded_at < Tracker_struct_manager.ttl:
+            return
+
+        with Tracker_struct_manager.__lock:
+            if tracker_struct_id in Tracker_struct_manager.__revalidating:
+                return
+            Tracker_struct_manager.__revalidating.add(tracker_struct_id)
+        threading.Thread(target=self.__revalidate, args=(tracker_struct_id,), daemon=True).start()
+
+    def __revalidate(self, tracker_struct_id):
+        try:
+            self.refresh(tracker_struct_id)
+        except Exception as e:
+            # Served as is until the next TTL expiry rather than retried on every access
+            Tracker_struct_manager.__loaded_at[tracker_struct_id] = time.time()
+            print(f"TSM: Revalidation of tracker struct {tracker_struct_id} failed: {e}")
+        finally:
+            with Tracker_struct_manager.__lock:
+                Tracker_struct_manager.__revalidating.discard(tracker_struct_id)
+
+    def __path(self, tracker_struct_id, suffix):
+        cache_dir = Tracker_struct_manager.cache_dir
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+            print(f"TSM: Created folder {cache_dir}")
+        return os.path.join(cache_dir, str(tracker_struct_id) + suffix)
+
+    def __remember(self, tracker_struct):
+        ts_id = tracker_struct["id"]
+        Tracker_struct_manager.__tracker_structs[ts_id] = tracker_struct
+        Tracker_struct_manager.__compiled_structs.pop(ts_id, None)
+        Tracker_struct_manager.__loaded_at[ts_id] = time.time()
+        Tracker_struct_manager.__hashes[ts_id] = self.__hash(tracker_struct)
+
+    def __load_ts(self, tracker_struct_id):
+        """Loads the tracker struct from disk into memory, returns False if there is no readable copy."""
+        ts_file_path = self.__path(tracker_struct_id, ts_suffix)
+        try:
+            with open(ts_file_path, 'r', encoding='utf-8') as file:
+                tracker_struct = json.load(file)
+        except FileNotFoundError:
+            return False
+        except ValueError as e:
+            print(f"TSM: Ignored unreadable tracker struct file {ts_file_path}: {e}")
+            return False
+
+        Tracker_struct_manager.__tracker_structs[tracker_struct_id] = tracker_struct
+        Tracker_struct_manager.__loaded_at[tracker_struct_id] = os.path.getmtime(ts_file_path)
+        print("TSM: Loaded tracker struct from disk " + str(tracker_struct_id))
+        return True
+
+    def __write_ts(self, tracker_struct):
+        """Atomic write, the caller holds the lock of the tracker struct."""
+        ts_id = tracker_struct["id"]
+        atomic_write(self.__path(ts_id, ts_suffix), json.dumps(tracker_struct, separators=(",", ":")).encode("utf-8"))
+        print("TSM: Saved tracker struct to disk " + str(ts_id))
+
+    @staticmethod
+    def __hash(tracker_struct):
+        return hashlib.sha256(json.dumps(tracker_struct, sort_keys=True).encode("utf-8")).hexdigest()
+
 class TrackerStruct:
     def __init__(self, json_data):
         self.id_tracker = json_data["id"]
         self.fields = {field["name"]: field for field in json_data["fields"]}
+        self.fields_by_id = {field["field_id"]: field for field in json_data["fields"]}
         self.ruleSet = RuleSet(json_data["workflow"]["rules"]["lists"])
+        # Label/ID maps of the list fields, built on first use and shared by all their Field_msb
+        self.__value_maps = {}
+        self.__decoder_plan = None
 
     def get_field_info(self, identifier):
         if isinstance(identifier, str):
@@ -49,27 +236,38 @@ class TrackerStruct:
                 raise KeyError(f"Field with name '{identifier}' not found.")
             return field_info
         elif isinstance(identifier, int):
-            for field_name, field_info in self.fields.items():
-                if field_info["field_id"] == identifier:
-                    return field_info
-            raise KeyError(f"Field with ID '{identifier}' not found.")
+            field_info = self.fields_by_id.get(identifier)
+            if field_info is None:
+                raise KeyError(f"Field with ID '{identifier}' not found.")
+            return field_info
         else:
             raise TypeError("Identifier must be a string (name) or an integer (field_id).")
 
+    def get_value_maps(self, identifier) -> Field_msb.Value_maps:
+        """Shared label/ID maps of a list field, by name or ID."""
+        field_info = self.get_field_info(identifier)
+        value_maps = self.__value_maps.get(field_info["field_id"])
+        if value_maps is None:
+            value_maps = Field_msb.Value_maps(field_info)
+            self.__value_maps[field_info["field_id"]] = value_maps
+        return value_maps
+
+    def get_decoder_plan(self) -> DecoderPlan:
+        """Decoders of the artifact values of this tracker, compiled on first use."""
+        if self.__decoder_plan is None or not self.__decoder_plan.is_current():
+            self.__decoder_plan = DecoderPlan(self)
+        return self.__decoder_plan
+
     def field_exists(self, identifier):
         """Checks if a field exists, by name or ID."""
-        try:
-            self.get_field_info(identifier)
-            return True
-        except KeyError:
-            return False
+        return identifier in self.fields or identifier in self.fields_by_id
 
     def idToName(self, field_id):
         """Gets the name of a field given its ID."""
-        for field_name, field_info in self.fields.items():
-            if field_info["field_id"] == field_id:
-                return field_name
-        raise KeyError(f"Field with ID '{field_id}' not found.")
+        field_info = self.fields_by_id.get(field_id)
+        if field_info is None:
+            raise KeyError(f"Field with ID '{field_id}' not found.")
+        return field_info["name"]
 
     def nameToId(self, field_name):
         """Gets the ID of a field given its name."""
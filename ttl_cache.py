@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+        Thread-safe in-process cache. Entries expire `ttl` seconds after they were set and the least
+        recently used ones are evicted beyond `max_entries`. Hits and misses are counted.
+    """
+    def __init__(self, max_entries=1024, ttl=300.0):
+        self.__max_entries = max_entries
+        self.__ttl = ttl
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached value, None if it is missing or expired."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.__entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.__ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.__entries)}
+
+    def __len__(self):
+        return len(self.__entries)
@@ -1,11 +1,16 @@
-# Tuleap Rest client
-from Tuleap.RestClient import Connection as con_api
-from Tuleap.RestClient import Artifacts as art_api
-from Tuleap.RestClient import Trackers as trk_api
-from Tuleap.RestClient import Users as usr_api
-from Tuleap.RestClient import UserGroups as ugp_api
+# Tuleap Rest client, its Connection module is imported by configure only
 from Tuleap.RestClient.Commons import CertificateVerification, FieldValues, Order
+from concurrent.futures import ThreadPoolExecutor
+import json
+import ssl
+import time
+import httpx
 import requests
+from tuleap_wrapper.response_cache import CachedResponse, ResponseCache
+from tuleap_wrapper.ttl_cache import TTLCache
+from tuleap_wrapper.single_flight import SingleFlight
+from tuleap_wrapper.metrics import MetricsRegistry, MetricsSink, OperationEvent
+from tuleap_wrapper.limiter import AdaptiveLimiter, THROTTLING_STATUS_CODES, backoff_delay, parse_retry_after
 
 class ErrorCodes:
     UNAUTHORIZED = 401
@@ -14,18 +19,89 @@ class ErrorCodes:
 class TuleapEndpoint:
     # Class attributes to hold the base_url and auth_token
     base_url = None
+    api_url = None
     auth_token = None
     connection = None
-    artifacts = None
-    trackers = None
-    users = None
-    user_groups = None
+    # Shared by all the threads, and by the DocumentInterface: every call gets its own
+    # response object, nothing is read back from a "last response" afterwards.
+    session = None
+    # Conditional-request cache of artifacts and tracker structs, disabled when None
+    response_cache: ResponseCache = None
+    # Users, user groups and group members, shared by all the threads
+    user_cache: TTLCache = None
+    # Coalesces identical GETs in flight, its stats() tell how many requests were saved
+    single_flight = SingleFlight()
+    # Adjusts the number of requests in flight to what the server sustains, shared by all the threads
+    limiter: AdaptiveLimiter = None
+    # Every operation is reported to these sinks, the registry aggregates them in process
+    metrics = MetricsRegistry()
+    metrics_sinks: list[MetricsSink] = [metrics]
+
+    DEFAULT_POOL_SIZE = 16
+    DEFAULT_TIMEOUT = 60.0
+    DEFAULT_CONNECT_TIMEOUT = 10.0
+    DEFAULT_MAX_RETRIES = 3
+    ARTIFACTS_QUERY_LIMIT_MAX = 100
+    USERS_PAGE_SIZE = 50
+    TRACKERS_PAGE_SIZE = 50
+    DEFAULT_USER_CACHE_SIZE = 4096
+    DEFAULT_USER_CACHE_TTL = 600.0
+
+    # HTTP settings, set by configure and used by every client built on this configuration
+    cert_verification = True
+    client_cert = None
+    pool_size = DEFAULT_POOL_SIZE
+    timeout = DEFAULT_TIMEOUT
+    connect_timeout = DEFAULT_CONNECT_TIMEOUT
+    http2 = False
+    max_retries = DEFAULT_MAX_RETRIES
 
     @classmethod
-    def configure(cls, base_url, auth_token, cert_verification=True):
-        """Method to set the base_url and auth_token once and for all."""
+    def configure(cls,
+                  base_url,
+                  auth_token,
+                  cert_verification=True,
+                  client_cert=None,
+                  pool_size=DEFAULT_POOL_SIZE,
+                  timeout=DEFAULT_TIMEOUT,
+                  connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                  http2=False,
+                  response_cache:ResponseCache=None,
+                  user_cache_size=DEFAULT_USER_CACHE_SIZE,
+                  user_cache_ttl=DEFAULT_USER_CACHE_TTL,
+                  max_retries=DEFAULT_MAX_RETRIES,
+                  limiter:AdaptiveLimiter=None):
+        """
+            Method to set the base_url and auth_token once and for all.
+
+            Parameters:
+            cert_verification (bool or str): Verify the server certificate, or path to a CA bundle to verify it with.
+            client_cert (str or tuple): Client certificate file, or (certificate, key) files.
+            pool_size (int): Number of keep-alive connections shared by all the requests.
+            timeout (float): Read, write and pool timeout in seconds.
+            connect_timeout (float): Connection timeout in seconds.
+            http2 (bool): Multiplex the requests over HTTP/2 connections, requires the `h2` package.
+            response_cache (ResponseCache): Storage of artifacts and tracker structs revalidated with
+                                            If-None-Match/If-Modified-Since. Default is no cache.
+            user_cache_size (int): Maximum number of users and groups kept in memory.
+            user_cache_ttl (float): Seconds a cached user or group is trusted before being requested again.
+            max_retries (int): Retries of a GET throttled (429/503) or failed on the network, with jittered backoff.
+            limiter (AdaptiveLimiter): Limit of the requests in flight. Default adapts between 1 and `pool_size`.
+        """
         cls.base_url = base_url
+        cls.api_url = base_url.rstrip("/") + "/api/"
         cls.auth_token = auth_token
+        cls.cert_verification = cert_verification
+        cls.client_cert = client_cert
+        cls.pool_size = pool_size
+        cls.timeout = timeout
+        cls.connect_timeout = connect_timeout
+        cls.http2 = http2
+        cls.response_cache = response_cache
+        cls.user_cache = TTLCache(max_entries=user_cache_size, ttl=user_cache_ttl)
+        cls.max_retries = max_retries
+        cls.limiter = limiter or AdaptiveLimiter(initial_limit=min(4, pool_size), max_limit=pool_size)
+        from Tuleap.RestClient import Connection as con_api
         cls.connection = con_api.Connection()
 
         if(cert_verification):
@@ -35,91 +111,308 @@ class TuleapEndpoint:
 
         success = cls.connection.set_access_key(base_url, auth_token, certificate_verification=verification)
         if success:
-            cls.artifacts = art_api.Artifacts(cls.connection)
-            cls.trackers = trk_api.Tracker(cls.connection)
-            cls.users = usr_api.Users(cls.connection)
-            cls.user_groups = ugp_api.UserGroups(cls.connection)
+            if cls.session:
+                cls.session.close()
+            cls.session = httpx.Client(**cls.http_client_settings())
         else:
             raise ConnectionRefusedError("TuleapEndpoint: Connection failed")
 
+    @classmethod
+    def http_client_settings(cls, pool_size=None) -> dict:
+        """Keyword arguments for an httpx.Client or httpx.AsyncClient following the configured HTTP settings."""
+        pool_size = pool_size or cls.pool_size
+        return {"headers": {"X-Auth-AccessKey": cls.auth_token},
+                "verify": cls._ssl_verification(),
+                "http2": cls.http2,
+                "timeout": httpx.Timeout(cls.timeout, connect=cls.connect_timeout),
+                "limits": httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)}
+
+    @classmethod
+    def _ssl_verification(cls):
+        if cls.client_cert is None and isinstance(cls.cert_verification, bool):
+            return cls.cert_verification
+
+        if isinstance(cls.cert_verification, bool):
+            context = ssl.create_default_context()
+        else:
+            context = ssl.create_default_context(cafile=cls.cert_verification)
+        if cls.cert_verification is False:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        if isinstance(cls.client_cert, tuple):
+            context.load_cert_chain(*cls.client_cert)
+        elif cls.client_cert:
+            context.load_cert_chain(cls.client_cert)
+        return context
+
     @classmethod
     def logout(cls):
         cls.connection.logout()
+        cls.session.close()
+        cls.session = None
 
     def __init__(self):
         """Initializer that ensures each instance has access to the configured variables."""
         if self.base_url is None or self.auth_token is None:
             raise ConnectionError("TuleapEndpoint not configured. Please call `configure` before creating instances.")
 
+    def _request(self, operation, method, relative_url, error_context, params=None, json=None, cacheable=False) -> httpx.Response:
+        """
+            Sends one request and returns its own response, raises HTTPError if it failed.
+            Identical GETs running at the same time in other threads share a single request.
+            The request is reported to the metrics sinks under the `operation` name.
+        """
+        if method == "GET":
+            return self.single_flight.do(self._request_key(relative_url, params),
+                                         self._send, operation, method, relative_url, error_context, params, json, cacheable)
+        return self._send(operation, method, relative_url, error_context, params, json, cacheable)
+
+    @staticmethod
+    def _request_key(relative_url, params):
+        return relative_url + "?" + "&".join(f"{key}={value}" for key, value in sorted((params or {}).items()))
+
+    def _send(self, operation, method, relative_url, error_context, params=None, json=None, cacheable=False) -> httpx.Response:
+        """A `cacheable` GET is revalidated against the response cache, a 304 gives back the cached body."""
+        cache_key, cached = self._cache_lookup(relative_url, params, cacheable)
+        headers = cached.conditional_headers() if cached else None
+
+        event = OperationEvent(operation, 0.0)
+        start = time.monotonic()
+        try:
+            response = self._send_with_retries(event, method, relative_url, params, json, headers)
+            return self._handle_response(event, response, error_context, cache_key, cached)
+        except httpx.TransportError:
+            event.error = True
+            raise
+        finally:
+            event.latency = time.monotonic() - start
+            self.record_operation(event)
+
+    @classmethod
+    def _cache_lookup(cls, relative_url, params, cacheable):
+        """Returns the response cache key of a `cacheable` GET and its cached entry, (None, None) if not cached."""
+        if not cacheable or cls.response_cache is None:
+            return None, None
+        cache_key = cls._request_key(relative_url, params)
+        return cache_key, cls.response_cache.get(cache_key)
+
+    @classmethod
+    def _handle_response(cls, event:OperationEvent, response, error_context, cache_key=None, cached=None) -> httpx.Response:
+        """Fills the event from the final response, serves a 304 from the cache, stores a cacheable one, raises HTTPError on error."""
+        event.status_code = response.status_code
+        event.bytes_in = len(response.content)
+        event.bytes_out = len(response.request.content)
+        if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+            event.cache_hit = True
+            return httpx.Response(httpx.codes.OK, content=cached.body, request=response.request)
+        if response.is_error:
+            event.error = True
+            raise requests.exceptions.HTTPError(f"{error_context} request failed with status code {response.status_code}: {response.text}",
+                                                response=response)
+        if cache_key:
+            entry = CachedResponse.from_response(response)
+            if entry:
+                cls.response_cache.set(cache_key, entry)
+        return response
+
+    def _send_with_retries(self, event:OperationEvent, method, relative_url, params=None, json=None, headers=None) -> httpx.Response:
+        """Sends the request when the limiter allows it, a GET is retried while it is throttled or fails on the network."""
+        attempt = 0
+        while True:
+            ticket = self.limiter.acquire()
+            event.requests += 1
+            start = time.monotonic()
+            response = None
+            throttled = False
+            retry_after = None
+            try:
+                response = self.session.request(method, self.api_url + relative_url, params=params, json=json, headers=headers)
+                throttled = response.status_code in THROTTLING_STATUS_CODES
+                retry_after = parse_retry_after(response.headers.get("Retry-After")) if throttled else None
+            except httpx.TransportError:
+                if method != "GET" or attempt >= self.max_retries:
+                    raise
+            finally:
+                # Whatever happened, the slot taken by acquire is given back
+                self.limiter.release(ticket, time.monotonic() - start, throttled=throttled,
+                                     retry_after=retry_after, failed=response is None)
+            if response is not None and (not throttled or method != "GET" or attempt >= self.max_retries):
+                return response
+
+            self.limiter.record_retry()
+            event.retries += 1
+            time.sleep(backoff_delay(attempt, retry_after=retry_after))
+            attempt += 1
+
+    @classmethod
+    def add_metrics_sink(cls, sink:MetricsSink):
+        cls.metrics_sinks.append(sink)
+
+    @classmethod
+    def record_operation(cls, event:OperationEvent):
+        """Reports an operation to every metrics sink, client-side operations included."""
+        for sink in cls.metrics_sinks:
+            try:
+                sink.record(event)
+            except Exception as e:
+                print(f"TuleapEndpoint: metrics sink {type(sink).__name__} failed: {e}")
+
     def get_artifact_by_id(self, artifact_id):
-        success = self.artifacts.request_artifact(artifact_id)
-        if not success:
-            response = self.artifacts.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Get artifact {str(artifact_id)} request failed with status code {response.status_code}: {response.text}")
-        return self.artifacts.get_data()
+        return self._request("get_artifact", "GET", f"artifacts/{artifact_id}", f"Get artifact {str(artifact_id)}", cacheable=True).json()
+
+    def map_artifacts(self, artifact_ids, workers=DEFAULT_POOL_SIZE):
+        """Fetches the artifacts with `workers` parallel threads, results are returned in input order."""
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.get_artifact_by_id, artifact_ids))
+
+    def get_artifacts_by_ids(self, artifact_ids, batch_size=ARTIFACTS_QUERY_LIMIT_MAX, workers=DEFAULT_POOL_SIZE):
+        """
+            Fetches many artifacts with the collection endpoint, `batch_size` artifacts per request.
+            Batches are sent in parallel, the result maps each artifact ID to its json, in input order.
+        """
+        artifact_ids = list(dict.fromkeys(artifact_ids))
+        batches = [artifact_ids[i:i + batch_size] for i in range(0, len(artifact_ids), batch_size)]
+        json_by_id = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for page in executor.map(self._get_artifacts_batch, batches):
+                for item in page:
+                    json_by_id[item["id"]] = item
+        return {artifact_id: json_by_id[artifact_id] for artifact_id in artifact_ids if artifact_id in json_by_id}
+
+    def _get_artifacts_batch(self, artifact_ids):
+        response = self._request("get_artifacts", "GET", "artifacts", f"Get artifacts {str(artifact_ids)}",
+                                 params={"query": json.dumps({"id": artifact_ids}), "limit": len(artifact_ids)})
+        data = response.json()
+        return data["collection"] if isinstance(data, dict) else data
 
     def get_tracker_struct_by_id(self, tracker_id):
-        success = self.trackers.request_tracker(tracker_id)
-        if not success:
-            response = self.trackers.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Get tracker struct {str(tracker_id)} request failed with status code {response.status_code}: {response.text}")
-        return self.trackers.get_data()
+        return self._request("get_tracker_struct", "GET", f"trackers/{tracker_id}", f"Get tracker struct {str(tracker_id)}", cacheable=True).json()
+
+    def get_project_tracker_ids(self, project_id):
+        """Lists the IDs of the trackers of a project."""
+        result = []
+        offset = 0
+        while True:
+            response = self._request("get_project_trackers", "GET", f"projects/{project_id}/trackers", f"Get trackers of project {str(project_id)}",
+                                     params={"representation": "minimal", "limit": self.TRACKERS_PAGE_SIZE, "offset": offset})
+            page = response.json()
+            result += [tracker["id"] for tracker in page]
+            offset += len(page)
+            total = int(response.headers.get("X-PAGINATION-SIZE", offset))
+            if not page or offset >= total:
+                return result
 
     def update_artifact_by_id(self, artifact_id, values):
-        success = self.artifacts.update_artifact(artifact_id, values)
-        if not success:
-            response = self.artifacts.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Update artifact {str(artifact_id)} request failed with status code {response.status_code}: {response.text}")
-        return success
+        self._request("update_artifact", "PUT", f"artifacts/{artifact_id}", f"Update artifact {str(artifact_id)}", json={"values": values})
+        return True
 
     def create_artifact(self, tracker_id, values_by_field=None, values=None):
-        success = self.artifacts.create_artifact(tracker_id, values_by_field, values)
-        if not success:
-            response = self.artifacts.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Create artifact on tracker {str(tracker_id)} request failed with status code {response.status_code}: {response.text}")
-        return success
+        payload = {"tracker": {"id": tracker_id}}
+        if values_by_field:
+            payload["values_by_field"] = values_by_field
+        else:
+            payload["values"] = values
+        self._request("create_artifact", "POST", "artifacts", f"Create artifact on tracker {str(tracker_id)}", json=payload)
+        return True
 
     def get_user_by_id(self, user_id):
-        success = self.users.request_user(user_id)
-        if not success:
-            response = self.users.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Get user {str(user_id)} request failed with status code {response.status_code}: {response.text}")
-        return self.users.get_data()
+        user = self.user_cache.get(("user", user_id))
+        if user is None:
+            user = self._fetch_user(user_id)
+        else:
+            self.record_operation(OperationEvent("get_user", 0.0, cache_hit=True))
+        return user
+
+    def _fetch_user(self, user_id):
+        user = self._request("get_user", "GET", f"users/{user_id}", f"Get user {str(user_id)}").json()
+        self.user_cache.set(("user", user_id), user)
+        return user
+
+    def get_users_by_ids(self, user_ids, workers=DEFAULT_POOL_SIZE):
+        """Resolves many users keyed by ID, only the ones missing from the cache are requested, in parallel."""
+        user_ids = list(dict.fromkeys(user_ids))
+        users = {}
+        missing_ids = []
+        for user_id in user_ids:
+            user = self.user_cache.get(("user", user_id))
+            if user is None:
+                missing_ids.append(user_id)
+            else:
+                self.record_operation(OperationEvent("get_user", 0.0, cache_hit=True))
+                users[user_id] = user
+
+        if missing_ids:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                users.update(zip(missing_ids, executor.map(self._fetch_user, missing_ids)))
+        return {user_id: users[user_id] for user_id in user_ids}
 
     def get_user_group_by_id(self, group_id):
-        success = self.user_groups.request_user_group(group_id)
-        if not success:
-            response = self.artifacts.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Get user group {str(group_id)} request failed with status code {response.status_code}: {response.text}")
-        return self.user_groups.get_data()
+        group = self.user_cache.get(("user_group", group_id))
+        if group is None:
+            group = self._request("get_user_group", "GET", f"user_groups/{group_id}", f"Get user group {str(group_id)}").json()
+            self.user_cache.set(("user_group", group_id), group)
+        else:
+            self.record_operation(OperationEvent("get_user_group", 0.0, cache_hit=True))
+        return group
 
     def get_users_in_group(self, group_id):
-        success = self.user_groups.request_users_in_group(group_id)
-        if not success:
-            response = self.artifacts.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Get users in group {str(group_id)} request failed with status code {response.status_code}: {response.text}")
-        return self.user_groups.get_data()
+        result = self.user_cache.get(("users_in_group", group_id))
+        if result is not None:
+            self.record_operation(OperationEvent("get_users_in_group", 0.0, cache_hit=True))
+            return list(result)
+
+        result = []
+        offset = 0
+        while True:
+            response = self._request("get_users_in_group", "GET", f"user_groups/{group_id}/users", f"Get users in group {str(group_id)}",
+                                     params={"limit": self.USERS_PAGE_SIZE, "offset": offset})
+            page = response.json()
+            result += page
+            offset += len(page)
+            total = int(response.headers.get("X-PAGINATION-SIZE", offset))
+            if not page or offset >= total:
+                self.user_cache.set(("users_in_group", group_id), result)
+                return list(result)
+
+    def _get_current_users_in_group(self, group_id):
+        """Members read from the server, not from the cache: the base of a read-modify-write must not be stale."""
+        self.user_cache.invalidate(("users_in_group", group_id))
+        return self.get_users_in_group(group_id)
 
     def add_users_in_group(self, group_id, user_ids):
-        success = self.user_groups.add_users_in_group(group_id, user_ids)
-        if not success:
-            response = self.artifacts.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Add users in group {str(group_id)} request failed with status code {response.status_code}: {response.text}")
-        return success
+        current_ids = [user["id"] for user in self._get_current_users_in_group(group_id)]
+        return self.set_users_in_group(group_id, current_ids + [uid for uid in user_ids if uid not in current_ids])
 
     def remove_users_in_group(self, group_id, user_ids):
-        success = self.user_groups.remove_users_in_group(group_id, user_ids)
-        if not success:
-            response = self.artifacts.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Remove users in group {str(group_id)} request failed with status code {response.status_code}: {response.text}")
-        return success
+        current_ids = [user["id"] for user in self._get_current_users_in_group(group_id)]
+        return self.set_users_in_group(group_id, [uid for uid in current_ids if uid not in user_ids])
 
     def set_users_in_group(self, group_id, user_ids):
-        success = self.user_groups.set_user_group_users(group_id, user_ids)
-        if not success:
-            response = self.artifacts.get_last_response_message()
-            raise requests.exceptions.HTTPError(f"Set users in group {str(group_id)} request failed with status code {response.status_code}: {response.text}")
-        return success
+        self._request("set_users_in_group", "PUT", f"user_groups/{group_id}/users", f"Set users in group {str(group_id)}",
+                      json={"user_references": [{"id": user_id} for user_id in user_ids]})
+        self.user_cache.invalidate(("users_in_group", group_id))
+        return True
+
+    def _artifact_list_params(self, limit, query=None, expert_query=None, order=Order.Ascending, field_values=FieldValues.No):
+        params = {"limit": limit,
+                  "order": "desc" if order == Order.Descending else "asc"}
+        if field_values == FieldValues.All:
+            params["values"] = "all"
+        if query:
+            params["query"] = query if isinstance(query, str) else json.dumps(query)
+        if expert_query:
+            params["expert_query"] = expert_query
+        return params
+
+    def _get_artifact_page(self, tracker_id, params, offset):
+        """
+            Returns one page of the tracker artifact list and the total count announced by the server
+            in X-PAGINATION-SIZE, None if the header is missing.
+        """
+        response = self._request("get_artifact_list", "GET", f"trackers/{tracker_id}/artifacts", f"Get artifact list of tracker {str(tracker_id)}",
+                                 params={**params, "offset": offset})
+        total = response.headers.get("X-PAGINATION-SIZE")
+        return response.json(), int(total) if total is not None else None
 
     def get_artifact_id_list(self,
                              tracker_id,
@@ -127,38 +420,112 @@ class TuleapEndpoint:
                              offset=None,
                              query=None,
                              expert_query=None,
-                             order=Order.Ascending):
+                             order=Order.Ascending,
+                             concurrency=None):
+        """
+            Lists the IDs of the tracker artifacts, `limit` per request, at most ARTIFACTS_QUERY_LIMIT_MAX.
+
+            With `concurrency` set, the total is read from the first page and all the remaining
+            offsets are fetched in parallel with at most `concurrency` requests in flight.
+        """
         REQUEST_LIMIT = 150
         current_offset = 0
         if (limit):
             REQUEST_LIMIT = limit
+        # Offsets step by the limit sent, a larger one would be capped by the server and skip artifacts
+        REQUEST_LIMIT = min(REQUEST_LIMIT, self.ARTIFACTS_QUERY_LIMIT_MAX)
         if (offset):
             current_offset = offset
 
-        returned_count = REQUEST_LIMIT
+        params = self._artifact_list_params(REQUEST_LIMIT, query, expert_query, order)
+        context = "get_artifact_id_list, tracker_id=" + str(tracker_id)
         result = []
-        while (returned_count==REQUEST_LIMIT):
-            success = self.trackers.request_artifact_list(tracker_id=tracker_id,
-                                            field_values=FieldValues.No,
-                                            limit=REQUEST_LIMIT,
-                                            offset=current_offset,
-                                            query=query,
-                                            expert_query=expert_query,
-                                            order=order)
-            if not success:
-                self.unsuccessful_warning(self.trackers.get_last_response_message().status_code, "create_artifact, tracker_id=" + str(tracker_id))
+        try:
+            local_result, total = self._get_artifact_page(tracker_id, params, current_offset)
+        except requests.exceptions.HTTPError as e:
+            self.unsuccessful_warning(e.response, context)
+            return result
+        result += [item["id"] for item in local_result]
+        # A page is short of the artifacts the user cannot read, they still count in the offsets and the total
+        current_offset += REQUEST_LIMIT
+
+        if concurrency and total is not None:
+            offsets = range(current_offset, total, REQUEST_LIMIT)
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                pages = executor.map(lambda page_offset: self._get_artifact_page(tracker_id, params, page_offset)[0], offsets)
+                try:
+                    for local_result in pages:
+                        result += [item["id"] for item in local_result]
+                except requests.exceptions.HTTPError as e:
+                    self.unsuccessful_warning(e.response, context)
+            return result
+
+        while self._has_next_page(local_result, REQUEST_LIMIT, current_offset, total):
+            try:
+                local_result, total = self._get_artifact_page(tracker_id, params, current_offset)
+            except requests.exceptions.HTTPError as e:
+                self.unsuccessful_warning(e.response, context)
                 break
-            local_result = self.trackers.get_data()
-            returned_count = len(local_result)
-            for item in local_result:
-                result.append(item["id"])
-            current_offset+=REQUEST_LIMIT
+            result += [item["id"] for item in local_result]
+            current_offset += REQUEST_LIMIT
 
         return result
 
-    def unsuccessful_warning(self, inErrorCode, inContext=None):
+    def _has_next_page(self, page, page_size, next_offset, total):
+        """
+            With the total announced, pages continue up to it, even after a short or empty page of
+            unreadable artifacts. Without it, a short page is taken as the last one.
+        """
+        if total is not None:
+            return next_offset < total
+        return len(page) == page_size
+
+    def iter_artifact_pages(self,
+                            tracker_id,
+                            page_size=ARTIFACTS_QUERY_LIMIT_MAX,
+                            query=None,
+                            expert_query=None,
+                            order=Order.Ascending):
+        """
+            Generator over the pages of the tracker artifact list, with the full field values.
+            The next page is requested while the current one is being consumed, and never more
+            than one page ahead.
+        """
+        # Offsets step by the page size sent, a larger one would be capped by the server and skip artifacts
+        page_size = min(page_size, self.ARTIFACTS_QUERY_LIMIT_MAX)
+        params = self._artifact_list_params(page_size, query, expert_query, order, field_values=FieldValues.All)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+            next_page = executor.submit(self._get_artifact_page, tracker_id, params, offset)
+            while next_page:
+                page, total = next_page.result()
+                # A page is short of the artifacts the user cannot read, they still count in the offsets and the total
+                offset += page_size
+                next_page = None
+                if self._has_next_page(page, page_size, offset, total):
+                    next_page = executor.submit(self._get_artifact_page, tracker_id, params, offset)
+                if page:
+                    yield page
+
+    def unsuccessful_warning(self, response, inContext=None):
         print("TuleapEndpoint request failed: " + inContext + "\n")
-        if inErrorCode == ErrorCodes.UNAUTHORIZED:
-            raise ConnectionError(self.connection.get_last_response_message().content)
+        if response.status_code == ErrorCodes.UNAUTHORIZED:
+            raise ConnectionError(response.content)
         else:
-            print(self.connection.get_last_response_message().content)
+            print(response.content)
+
+class LazyEndpoint:
+    """
+        Class attribute giving a TuleapEndpoint, created on first access rather than when the
+        owning module is imported, so modules can be imported before `TuleapEndpoint.configure`.
+
+            class Artifact:
+                __tuleap_endpoint = LazyEndpoint()
+    """
+    def __init__(self):
+        self.__endpoint = None
+
+    def __get__(self, instance, owner) -> TuleapEndpoint:
+        if self.__endpoint is None:
+            self.__endpoint = TuleapEndpoint()
+        return self.__endpoint
@@ -1,6 +1,14 @@
+import os
 import re
+import tempfile
 from datetime import datetime, timezone, timedelta
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 def iso_to_datetime(iso_string: str) -> datetime:
     """
     Manually parses an ISO 8601 formatted string and converts it to a datetime object.
@@ -76,3 +84,52 @@ def datetime_to_iso(dt: datetime, use_z: bool = False) -> str:
 
     # Combine into final ISO string
     return f"{date_part}T{time_part}{tz_part}"
+
+
+def atomic_write(path: str, data: bytes):
+    """
+    Writes a file through a temporary file renamed over the target, readers never see a partial file.
+
+    :param path: Path of the file to write
+    :param data: Full content of the file
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class FileLock:
+    """
+    Exclusive lock on a lock file, shared by all the threads and processes opening the same path.
+
+    Usage:
+        with FileLock("/path/to/resource.lock"):
+            ...
+    """
+
+    def __init__(self, path: str):
+        self.__path = path
+        self.__file = None
+
+    def __enter__(self):
+        self.__file = open(self.__path, "a+b")
+        if fcntl:
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.__file.seek(0)
+            msvcrt.locking(self.__file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if fcntl:
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.__file.seek(0)
+            msvcrt.locking(self.__file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.__file.close()
+        self.__file = None